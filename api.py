@@ -4,19 +4,28 @@ B2B Integration Endpoints
 """
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Tuple
 import asyncio
-import json
-from pathlib import Path
-from workflow import AutoInsuranceWorkflow, ClaimInfo, ClaimDecision, FNOLSummary, TriageDecision, FraudSignal
-import uvicorn
+import functools
+import importlib
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from itertools import islice
+import orjson
+
+if TYPE_CHECKING:
+    from workflow import AutoInsuranceWorkflow
 
 app = FastAPI(
     title="Ema Agentic Claims API",
     description="B2B API for autonomous claims processing",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Request/Response Models
@@ -49,28 +58,104 @@ class HealthResponse(BaseModel):
     version: str
     agentic_mode_available: bool
 
-# In-memory storage for demo (replace with database in production)
-processed_claims: Dict[str, Dict[str, Any]] = {}
+# In-memory storage for demo (replace with database in production). Ordered by last write:
+# reads never reorder it, so list_claims pagination stays stable, and the oldest write is evicted first
+CLAIMS_STORE_MAXSIZE = int(os.getenv("CLAIMS_STORE_MAXSIZE", "100000"))
+processed_claims: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+# Running aggregates over processed_claims so /metrics doesn't rescan the store
+_metrics: Dict[str, float] = {"total": 0, "sum_time": 0.0, "fraud_refs": 0, "approved": 0, "overrides": 0}
+_metrics_lock = threading.Lock()
+
+# Flattened (processing_time_ms, is_fraud, is_approved, is_overridden) per stored claim,
+# computed once at write time so removals don't re-walk the nested entry
+_claim_flags: Dict[str, Tuple[float, int, int, int]] = {}
+
+def _metric_flags(entry: Dict[str, Any]) -> Tuple[float, int, int, int]:
+    fraud_signal = entry.get("fraud_signal")
+    decision = entry.get("decision")
+    return (
+        entry.get("processing_time_ms", 0),
+        int(fraud_signal is not None and fraud_signal.get("risk_score", 0) > 0.5),
+        int(decision is not None and bool(decision.get("covered", False))),
+        int("override" in entry),
+    )
+
+def _apply_metrics(flags: Tuple[float, int, int, int], sign: int = 1) -> None:
+    """Add (sign=1) or remove (sign=-1) a claim's flags from the aggregates"""
+    processing_time, is_fraud, is_approved, is_overridden = flags
+    with _metrics_lock:
+        _metrics["total"] += sign
+        _metrics["sum_time"] += sign * processing_time
+        _metrics["fraud_refs"] += sign * is_fraud
+        _metrics["approved"] += sign * is_approved
+        _metrics["overrides"] += sign * is_overridden
+
+def _drop_claim_flags(claim_number: str) -> None:
+    previous = _claim_flags.pop(claim_number, None)
+    if previous is not None:
+        _apply_metrics(previous, -1)
+
+def _set_claim_flags(claim_number: str, entry: Dict[str, Any]) -> None:
+    """(Re)compute a claim's flags, swapping its old contribution for the new one"""
+    _drop_claim_flags(claim_number)
+    flags = _metric_flags(entry)
+    _claim_flags[claim_number] = flags
+    _apply_metrics(flags)
+
+def _store_claim(claim_number: str, entry: Dict[str, Any]) -> None:
+    """Insert or replace a processed claim, evicting the oldest-written entries past the cap"""
+    processed_claims[claim_number] = entry
+    processed_claims.move_to_end(claim_number)
+    _set_claim_flags(claim_number, entry)
+    
+    while len(processed_claims) > CLAIMS_STORE_MAXSIZE:
+        evicted_number, _ = processed_claims.popitem(last=False)
+        _drop_claim_flags(evicted_number)
+
+_workflow_lock = threading.Lock()
+
+# Cap concurrent claims per batch so fan-out doesn't swamp the threadpool / LLM rate limits.
+# asyncio.Semaphore binds to the first loop that waits on it, so keep one per event loop
+# (TestClient instances, embedded apps and asyncio.run() callers each bring their own)
+BATCH_CONCURRENCY = int(os.getenv("CLAIMS_BATCH_CONCURRENCY", "32"))
+_batch_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+def _batch_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _batch_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _batch_semaphores[loop] = asyncio.Semaphore(BATCH_CONCURRENCY)
+    return semaphore
 
-def get_workflow(use_agentic: bool = True):
-    """Initialize workflow with optional agentic mode"""
-    import os
+def _workflow_module():
+    """Import the workflow module (pydantic models, LlamaIndex, LLM SDK) on first use"""
+    return importlib.import_module("workflow")
+
+@functools.lru_cache(maxsize=2)
+def _build_workflow(use_agentic: bool) -> "AutoInsuranceWorkflow":
+    """Construct the workflow (and Gemini client) once per agentic flag"""
+    workflow_module = _workflow_module()
     llm = None
-    if use_agentic and os.getenv("GEMINI_API_KEY"):
-        from workflow import GeminiStructuredClient
-        llm = GeminiStructuredClient(api_key=os.getenv("GEMINI_API_KEY"))
+    api_key = os.getenv("GEMINI_API_KEY")
+    if use_agentic and api_key:
+        llm = workflow_module.GeminiStructuredClient(api_key=api_key)
     
-    return AutoInsuranceWorkflow(
+    return workflow_module.AutoInsuranceWorkflow(
         policy_retriever=None,
         llm=llm if llm and hasattr(llm, 'available') and llm.available else None,
         verbose=False,
         timeout=30.0
     )
 
+def get_workflow(use_agentic: bool = True) -> "AutoInsuranceWorkflow":
+    """Return the shared workflow for the requested mode (built on first use)"""
+    with _workflow_lock:
+        return _build_workflow(use_agentic)
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
-    import os
     return HealthResponse(
         status="healthy",
         service="Ema Agentic Claims API",
@@ -78,52 +163,61 @@ async def health_check():
         agentic_mode_available=bool(os.getenv("GEMINI_API_KEY"))
     )
 
-@app.post("/api/v1/claims/process", response_model=ClaimSubmissionResponse)
+@app.post(
+    "/api/v1/claims/process",
+    response_model=None,
+    responses={200: {"model": ClaimSubmissionResponse}}
+)
 async def process_claim(request: ClaimSubmissionRequest):
     """Process a single claim through the agentic workflow"""
-    import time
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     
     try:
         # Validate claim data
-        claim_info = ClaimInfo.model_validate(request.claim_data)
-        
-        # Create temp file for workflow
-        temp_path = Path(f"/tmp/claim_{claim_info.claim_number}.json")
-        temp_path.parent.mkdir(parents=True, exist_ok=True)
-        temp_path.write_text(json.dumps(request.claim_data))
+        claim_info = _workflow_module().ClaimInfo.model_validate(request.claim_data)
         
-        # Run workflow
+        # Run workflow on the already-validated model (no second parse in load_claim_info)
         workflow = get_workflow(request.use_agentic_mode)
-        result = await workflow.run(claim_json_path=str(temp_path))
-        
-        # Clean up temp file
-        temp_path.unlink(missing_ok=True)
+        if workflow.llm is None:
+            # Rule-based mode is pure CPU work; keep it off the event loop thread
+            result = await asyncio.to_thread(workflow.run_sync, claim_model=claim_info)
+        else:
+            # Agentic mode is dominated by LLM calls, which already await in worker threads
+            result = await workflow.run(claim_model=claim_info)
         
-        processing_time = (time.time() - start_time) * 1000
+        processing_time = (time.perf_counter_ns() - start_ns) / 1e6
         
-        # Store result
-        processed_claims[claim_info.claim_number] = {
-            "decision": result["decision"].model_dump() if result.get("decision") else None,
-            "fnol_summary": result["fnol_summary"].model_dump() if result.get("fnol_summary") else None,
-            "triage": result["triage"].model_dump() if result.get("triage") else None,
-            "fraud_signal": result["fraud_signal"].model_dump() if result.get("fraud_signal") else None,
+        # Dump each agent output once, straight to JSON-native types
+        result_dump = {k: v.model_dump(mode='json') if v else None for k, v in result.items()}
+        # claim_number is baked in so list_claims can return stored entries as-is
+        entry = {
+            "claim_number": claim_info.claim_number,
+            **result_dump,
             "processing_time_ms": processing_time
         }
         
-        return ClaimSubmissionResponse(
-            claim_number=claim_info.claim_number,
-            status="processed",
-            decision=processed_claims[claim_info.claim_number]["decision"],
-            fnol_summary=processed_claims[claim_info.claim_number]["fnol_summary"],
-            triage=processed_claims[claim_info.claim_number]["triage"],
-            fraud_signal=processed_claims[claim_info.claim_number]["fraud_signal"],
-            processing_time_ms=processing_time
-        )
+        # Store result
+        _store_claim(claim_info.claim_number, entry)
+        
+        return {"status": "processed", **entry}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing claim: {str(e)}")
 
+async def _process_bounded(claim_data: Dict[str, Any], use_agentic_mode: bool) -> Dict[str, Any]:
+    """Run one batch item through process_claim under the shared batch semaphore"""
+    async with _batch_semaphore():
+        return await process_claim(ClaimSubmissionRequest(
+            claim_data=claim_data,
+            use_agentic_mode=use_agentic_mode
+        ))
+
+def _failed_claim_response() -> Dict[str, Any]:
+    return ClaimSubmissionResponse.model_construct(
+        claim_number="UNKNOWN",
+        status="failed"
+    ).model_dump()
+
 @app.post("/api/v1/claims/batch", response_model=BatchClaimResponse)
 async def process_batch(request: BatchClaimRequest):
     """Process multiple claims in parallel"""
@@ -131,14 +225,8 @@ async def process_batch(request: BatchClaimRequest):
     processed = 0
     failed = 0
     
-    # Process claims in parallel
-    tasks = []
-    for claim_data in request.claims:
-        task = process_claim(ClaimSubmissionRequest(
-            claim_data=claim_data,
-            use_agentic_mode=request.use_agentic_mode
-        ))
-        tasks.append(task)
+    # Process claims in parallel (bounded)
+    tasks = [_process_bounded(claim_data, request.use_agentic_mode) for claim_data in request.claims]
     
     # Gather results
     batch_results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -146,20 +234,41 @@ async def process_batch(request: BatchClaimRequest):
     for result in batch_results:
         if isinstance(result, Exception):
             failed += 1
-            results.append(ClaimSubmissionResponse(
-                claim_number="UNKNOWN",
-                status="failed"
-            ))
+            results.append(_failed_claim_response())
         else:
             processed += 1
             results.append(result)
     
-    return BatchClaimResponse(
-        total_claims=len(request.claims),
-        processed=processed,
-        failed=failed,
-        results=results
-    )
+    # Results are already plain dicts; serialize once without re-validating
+    return ORJSONResponse(content={
+        "total_claims": len(request.claims),
+        "processed": processed,
+        "failed": failed,
+        "results": results
+    })
+
+@app.post("/api/v1/claims/batch/stream")
+async def process_batch_stream(request: BatchClaimRequest):
+    """Process multiple claims in parallel, streaming each result as NDJSON when it completes"""
+    tasks = [
+        asyncio.ensure_future(_process_bounded(claim_data, request.use_agentic_mode))
+        for claim_data in request.claims
+    ]
+    
+    async def stream_results():
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    result = await next_done
+                except Exception:
+                    result = _failed_claim_response()
+                yield orjson.dumps(result) + b"\n"
+        finally:
+            # Client disconnected mid-stream: don't leave orphaned claims running
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
 
 @app.get("/api/v1/claims/{claim_number}")
 async def get_claim_status(claim_number: str):
@@ -167,17 +276,19 @@ async def get_claim_status(claim_number: str):
     if claim_number not in processed_claims:
         raise HTTPException(status_code=404, detail=f"Claim {claim_number} not found")
     
-    return JSONResponse(content=processed_claims[claim_number])
+    return ORJSONResponse(content=processed_claims[claim_number])
 
 @app.get("/api/v1/claims")
 async def list_claims(limit: int = 100, offset: int = 0):
     """List all processed claims"""
-    claim_list = list(processed_claims.items())[offset:offset + limit]
-    return JSONResponse(content={
-        "total": len(processed_claims),
+    total = len(processed_claims)
+    start = max(offset, 0)
+    claim_list = list(islice(processed_claims.values(), start, start + max(limit, 0)))
+    return ORJSONResponse(content={
+        "total": total,
         "limit": limit,
         "offset": offset,
-        "claims": [{"claim_number": k, **v} for k, v in claim_list]
+        "claims": claim_list
     })
 
 @app.post("/api/v1/claims/{claim_number}/override")
@@ -186,18 +297,22 @@ async def override_decision(claim_number: str, override_data: Dict[str, Any]):
     if claim_number not in processed_claims:
         raise HTTPException(status_code=404, detail=f"Claim {claim_number} not found")
     
+    entry = processed_claims[claim_number]
+    
     # Store override
-    processed_claims[claim_number]["override"] = {
-        "original_decision": processed_claims[claim_number]["decision"],
+    entry["override"] = {
+        "original_decision": entry["decision"],
         "override_decision": override_data,
         "timestamp": time.time()
     }
     
     # Update decision
-    processed_claims[claim_number]["decision"] = override_data
-    processed_claims[claim_number]["decision"]["overridden"] = True
+    entry["decision"] = override_data
+    entry["decision"]["overridden"] = True
+    processed_claims.move_to_end(claim_number)
+    _set_claim_flags(claim_number, entry)
     
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "claim_number": claim_number,
         "status": "overridden",
         "decision": processed_claims[claim_number]["decision"]
@@ -206,33 +321,42 @@ async def override_decision(claim_number: str, override_data: Dict[str, Any]):
 @app.get("/api/v1/metrics")
 async def get_metrics():
     """Get processing metrics and KPIs"""
-    if not processed_claims:
-        return JSONResponse(content={
+    with _metrics_lock:
+        total = _metrics["total"]
+        sum_time = _metrics["sum_time"]
+        fraud_referrals = _metrics["fraud_refs"]
+        approved = _metrics["approved"]
+        overrides = _metrics["overrides"]
+    
+    if not total:
+        return ORJSONResponse(content={
             "total_claims_processed": 0,
             "avg_processing_time_ms": 0,
             "fraud_referral_rate": 0,
             "coverage_approval_rate": 0
         })
     
-    total = len(processed_claims)
-    avg_time = sum(c.get("processing_time_ms", 0) for c in processed_claims.values()) / total
-    
-    fraud_referrals = sum(1 for c in processed_claims.values() 
-                         if c.get("fraud_signal", {}).get("risk_score", 0) > 0.5)
-    fraud_rate = (fraud_referrals / total) * 100 if total > 0 else 0
+    avg_time = sum_time / total
+    fraud_rate = (fraud_referrals / total) * 100
+    approval_rate = (approved / total) * 100
     
-    approved = sum(1 for c in processed_claims.values() 
-                  if c.get("decision", {}).get("covered", False))
-    approval_rate = (approved / total) * 100 if total > 0 else 0
-    
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "total_claims_processed": total,
         "avg_processing_time_ms": round(avg_time, 2),
         "fraud_referral_rate": round(fraud_rate, 2),
         "coverage_approval_rate": round(approval_rate, 2),
-        "manual_overrides": sum(1 for c in processed_claims.values() if "override" in c)
+        "manual_overrides": overrides
     })
 
 if __name__ == "__main__":
-    import time
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    import uvicorn
+    # uvloop/httptools ship with uvicorn[standard]. Claim store and metrics are per-process,
+    # so only raise WEB_CONCURRENCY once they move to shared storage.
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
@@ -4,20 +4,46 @@ Handles inspection assignment, photo uploads, and damage assessment
 """
 
 import streamlit as st
+import numpy as np
+import io
 import json
 from pathlib import Path
 from datetime import datetime
 import os
 from dotenv import load_dotenv
+from PIL import Image, ImageOps
 
 load_dotenv()
 
+# Static widget options, kept together as module constants so the form code only references them
+APPRAISERS: tuple[str, ...] = ("Unassigned", "John Smith", "Sarah Johnson", "Mike Chen")
+DAMAGE_AREAS: tuple[str, ...] = (
+    "Front Bumper", "Rear Bumper", "Front Driver Door", "Front Passenger Door",
+    "Rear Driver Door", "Rear Passenger Door", "Hood", "Trunk", "Roof",
+    "Driver Fender", "Passenger Fender", "Windshield", "Headlights", "Taillights",
+)
+REPAIR_COMPLEXITY_OPTIONS: tuple[str, ...] = ("Minor", "Moderate", "Extensive", "Total Loss")
+
+# Simple logic for demo
+VEHICLE_VALUE = 15000.0  # Mock value
+TOTAL_LOSS_THRESHOLD = VEHICLE_VALUE * 0.75
+
 st.set_page_config(
     page_title="Appraiser Integration",
     page_icon="🔧",
     layout="wide"
 )
 
+@st.cache_data(show_spinner=False)
+def make_thumbnail(data: bytes, size: tuple[int, int] = (256, 256)) -> bytes:
+    """Downscale an uploaded photo to a JPEG thumbnail (cached by file content)"""
+    # Apply the EXIF orientation first; re-encoding drops the tag, so portrait shots would render sideways
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    image.thumbnail(size)
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, "JPEG", quality=80)
+    return buffer.getvalue()
+
 # Initialize session state
 if 'inspection_queue' not in st.session_state:
     st.session_state.inspection_queue = []
@@ -81,7 +107,7 @@ with tab1:
                 with col1:
                     appraiser = st.selectbox(
                         "Assign to Appraiser",
-                        ["Unassigned", "John Smith", "Sarah Johnson", "Mike Chen"],
+                        APPRAISERS,
                         key=f"appraiser_{idx}"
                     )
                 
@@ -152,7 +178,8 @@ with tab2:
             cols = st.columns(min(len(uploaded_photos), 4))
             for idx, photo in enumerate(uploaded_photos[:4]):
                 with cols[idx % 4]:
-                    st.image(photo, caption=photo.name, use_container_width=True)
+                    # Shown at native size; stretching the thumbnail to the column width blurs it
+                    st.image(make_thumbnail(photo.getvalue()), caption=photo.name)
             
             if len(uploaded_photos) > 4:
                 st.caption(f"+ {len(uploaded_photos) - 4} more photo(s)")
@@ -167,15 +194,13 @@ with tab2:
         with col1:
             damage_areas = st.multiselect(
                 "Damaged Areas",
-                ["Front Bumper", "Rear Bumper", "Front Driver Door", "Front Passenger Door",
-                 "Rear Driver Door", "Rear Passenger Door", "Hood", "Trunk", "Roof",
-                 "Driver Fender", "Passenger Fender", "Windshield", "Headlights", "Taillights"],
+                DAMAGE_AREAS,
                 default=["Front Bumper"]
             )
             
             repair_complexity = st.select_slider(
                 "Repair Complexity",
-                options=["Minor", "Moderate", "Extensive", "Total Loss"],
+                options=REPAIR_COMPLEXITY_OPTIONS,
                 value="Moderate"
             )
         
@@ -198,15 +223,11 @@ with tab2:
         st.markdown("---")
         st.subheader("💡 Recommendation")
         
-        # Simple logic for demo
-        vehicle_value = 15000.0  # Mock value
-        total_loss_threshold = vehicle_value * 0.75
-        
-        if estimated_repair_cost >= total_loss_threshold:
-            st.error(f"⚠️ **Total Loss Recommended** - Repair cost (${estimated_repair_cost:,.2f}) exceeds 75% of vehicle value (${vehicle_value:,.2f})")
+        if estimated_repair_cost >= TOTAL_LOSS_THRESHOLD:
+            st.error(f"⚠️ **Total Loss Recommended** - Repair cost (${estimated_repair_cost:,.2f}) exceeds 75% of vehicle value (${VEHICLE_VALUE:,.2f})")
             recommendation = "Total Loss"
         else:
-            st.success(f"✅ **Repairable** - Repair cost (${estimated_repair_cost:,.2f}) is below threshold (${total_loss_threshold:,.2f})")
+            st.success(f"✅ **Repairable** - Repair cost (${estimated_repair_cost:,.2f}) is below threshold (${TOTAL_LOSS_THRESHOLD:,.2f})")
             recommendation = "Repair"
         
         # Final notes
@@ -257,16 +278,19 @@ with tab3:
         st.info("📊 No completed inspections yet. Complete assessments from the Photo Upload tab.")
     else:
         # Summary metrics
-        total = len(st.session_state.completed_inspections)
-        total_loss_count = sum(1 for a in st.session_state.completed_inspections if a['recommendation'] == "Total Loss")
-        avg_cost = sum(a['estimated_cost'] for a in st.session_state.completed_inspections) / total
+        completed = st.session_state.completed_inspections
+        total = len(completed)
+        costs = np.fromiter((a['estimated_cost'] for a in completed), dtype=np.float64, count=total)
+        is_total_loss = np.fromiter((a['recommendation'] == "Total Loss" for a in completed), dtype=np.bool_, count=total)
+        total_loss_rate = is_total_loss.mean() * 100
+        avg_cost = costs.mean()
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
             st.metric("Total Inspections", total)
         with col2:
-            st.metric("Total Loss Rate", f"{(total_loss_count/total*100):.1f}%")
+            st.metric("Total Loss Rate", f"{total_loss_rate:.1f}%")
         with col3:
             st.metric("Avg Repair Cost", f"${avg_cost:,.2f}")
         
@@ -3,87 +3,17 @@ Policy Retrieval Module - Vector Store Implementation
 Loads policy documents into vector store for semantic search
 """
 
-from llama_index.core import Document, VectorStoreIndex, Settings
-from llama_index.core.node_parser import SentenceSplitter
 from pathlib import Path
 import os
-from typing import List
+import re
+import time
+from typing import Final, List
+from functools import lru_cache
 
-class PolicyRetriever:
-    """
-    Retrieves relevant policy information using vector similarity search
-    """
-    
-    def __init__(self, policy_docs_path: str = None):
-        """
-        Initialize policy retriever with vector store
-        
-        Args:
-            policy_docs_path: Path to policy documents (defaults to data/policy_documents.md)
-        """
-        if policy_docs_path is None:
-            policy_docs_path = Path(__file__).parent / "data" / "policy_documents.md"
-        
-        self.policy_docs_path = Path(policy_docs_path)
-        self.index = None
-        self._load_policy_store()
-    
-    def _load_policy_store(self):
-        """Load policy documents into vector store"""
-        if not self.policy_docs_path.exists():
-            print(f"Warning: Policy documents not found at {self.policy_docs_path}")
-            return
-        
-        try:
-            # For now, use fallback mode to avoid OpenAI API key requirement
-            # In production, configure with local embeddings or OpenAI key
-            print(f"⚠️ Policy vector store using fallback mode (keyword matching)")
-            print(f"   To enable semantic search, set OPENAI_API_KEY or use local embeddings")
-            self.index = None
-            
-        except Exception as e:
-            print(f"Error loading policy store: {e}")
-            self.index = None
-    
-    def retrieve(self, query: str, top_k: int = 3) -> str:
-        """
-        Retrieve relevant policy information for a query
-        
-        Args:
-            query: Search query (e.g., "commercial use exclusions")
-            top_k: Number of relevant chunks to retrieve
-        
-        Returns:
-            Concatenated relevant policy text
-        """
-        if self.index is None:
-            return self._get_fallback_text(query)
-        
-        try:
-            # Query vector store
-            retriever = self.index.as_retriever(similarity_top_k=top_k)
-            nodes = retriever.retrieve(query)
-            
-            # Concatenate results
-            results = []
-            for node in nodes:
-                results.append(node.text)
-            
-            return "\n\n".join(results) if results else self._get_fallback_text(query)
-            
-        except Exception as e:
-            print(f"Error retrieving from vector store: {e}")
-            return self._get_fallback_text(query)
-    
-    def _get_fallback_text(self, query: str) -> str:
-        """
-        Fallback policy text when vector store unavailable
-        """
-        query_lower = query.lower()
-        
-        # Commercial use query
-        if "commercial" in query_lower or "delivery" in query_lower or "rideshare" in query_lower:
-            return """
+# Fallback policy excerpts used when the vector store is unavailable
+
+# Commercial use query
+_COMMERCIAL_USE_TEXT: Final[str] = """
             Standard personal auto policies exclude commercial use including:
             - Food delivery (pizza, groceries, restaurant meals)
             - Ridesharing services (Uber, Lyft)
@@ -93,10 +23,9 @@ class PolicyRetriever:
             Any accident during commercial use results in claim denial.
             Commercial auto policy required for business use.
             """
-        
-        # Total loss query
-        elif "total loss" in query_lower or "totaled" in query_lower:
-            return """
+
+# Total loss query
+_TOTAL_LOSS_TEXT: Final[str] = """
             Total Loss Threshold: Repair cost ≥ 75% of vehicle's actual cash value (ACV)
             
             Settlement Process:
@@ -108,10 +37,9 @@ class PolicyRetriever:
             
             New Car Replacement available on premium policies if total loss within 2 years of purchase.
             """
-        
-        # Fraud query
-        elif "fraud" in query_lower or "suspicious" in query_lower:
-            return """
+
+# Fraud query
+_FRAUD_TEXT: Final[str] = """
             Fraud Red Flags requiring SIU referral:
             - Late reporting (>72 hours)
             - Inconsistent statements vs police report
@@ -122,10 +50,9 @@ class PolicyRetriever:
             - Multiple claims in short timeframe
             - Attorney involvement within 48 hours
             """
-        
-        # Vandalism query
-        elif "vandalism" in query_lower or "comprehensive" in query_lower or "theft" in query_lower:
-            return """
+
+# Vandalism query
+_COMPREHENSIVE_TEXT: Final[str] = """
             Comprehensive coverage applies to:
             - Vandalism (graffiti, keying, broken windows, slashed tires)
             - Theft of vehicle, parts, or contents
@@ -137,10 +64,9 @@ class PolicyRetriever:
             - Failure to file police report may result in denial
             - Comprehensive deductible applies
             """
-        
-        # Bodily injury query
-        elif "bodily injury" in query_lower or "injury" in query_lower or "medical" in query_lower:
-            return """
+
+# Bodily injury query
+_BODILY_INJURY_TEXT: Final[str] = """
             Bodily Injury Coverage:
             - Pays for injuries to others when policyholder is at fault
             - Medical Payments coverage pays for policyholder/passenger injuries regardless of fault
@@ -154,10 +80,9 @@ class PolicyRetriever:
             
             High medical treatment costs and attorney involvement increase litigation risk.
             """
-        
-        # Subrogation query
-        elif "subrogation" in query_lower or "not at fault" in query_lower:
-            return """
+
+# Subrogation query
+_SUBROGATION_TEXT: Final[str] = """
             Subrogation pursued when:
             - Policyholder 0% at fault
             - Other party identified with valid insurance
@@ -172,10 +97,9 @@ class PolicyRetriever:
             4. Reimburse policyholder's deductible if full recovery
             5. Recover claim payout amount
             """
-        
-        # Default
-        else:
-            return """
+
+# Default
+_DEFAULT_POLICY_TEXT: Final[str] = """
             Standard Auto Policy Coverage:
             - Bodily Injury Liability: Covers injuries to others
             - Property Damage Liability: Covers damage to others' property
@@ -191,11 +115,135 @@ class PolicyRetriever:
             - Vehicle used without permission
             """
 
+# (pattern, text) checked in order; first bucket whose pattern occurs in the query wins.
+# One compiled alternation per bucket keeps that precedence (a single combined
+# pattern would pick whichever keyword appears leftmost in the query instead).
+_FALLBACK_TABLE: Final = tuple(
+    (re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE), text)
+    for keywords, text in (
+        (("commercial", "delivery", "rideshare"), _COMMERCIAL_USE_TEXT),
+        (("total loss", "totaled"), _TOTAL_LOSS_TEXT),
+        (("fraud", "suspicious"), _FRAUD_TEXT),
+        (("vandalism", "comprehensive", "theft"), _COMPREHENSIVE_TEXT),
+        (("bodily injury", "injury", "medical"), _BODILY_INJURY_TEXT),
+        (("subrogation", "not at fault"), _SUBROGATION_TEXT),
+    )
+)
+
+class PolicyRetriever:
+    """
+    Retrieves relevant policy information using vector similarity search
+    """
+    
+    def __init__(self, policy_docs_path: str = None, cache_ttl_s: float = 600.0):
+        """
+        Initialize policy retriever with vector store
+        
+        Args:
+            policy_docs_path: Path to policy documents (defaults to data/policy_documents.md)
+            cache_ttl_s: How long a memoized query result may be served (0 disables expiry)
+        """
+        if policy_docs_path is None:
+            policy_docs_path = Path(__file__).parent / "data" / "policy_documents.md"
+        
+        self.policy_docs_path = Path(policy_docs_path)
+        self.index = None
+        self._cache_ttl_s = cache_ttl_s
+        self._epoch = 0
+        self._load_policy_store()
+        # Per-instance memo of (query, top_k, epoch, ttl bucket) -> text; workflows repeat the
+        # same queries per claim. The ttl bucket expires entries, the epoch drops them on reload.
+        self._retrieve_cached = lru_cache(maxsize=512)(self._retrieve_uncached)
+    
+    def reload(self):
+        """Reload the policy store and invalidate memoized query results"""
+        self._load_policy_store()
+        self._epoch += 1
+        self._retrieve_cached.cache_clear()
+    
+    def _cache_bucket(self) -> int:
+        return int(time.monotonic() // self._cache_ttl_s) if self._cache_ttl_s > 0 else 0
+    
+    def _load_policy_store(self):
+        """Load policy documents into vector store"""
+        if not self.policy_docs_path.exists():
+            print(f"Warning: Policy documents not found at {self.policy_docs_path}")
+            return
+        
+        try:
+            # For now, use fallback mode to avoid OpenAI API key requirement
+            # In production, configure with local embeddings or OpenAI key
+            # (import llama_index.core's VectorStoreIndex/SentenceSplitter here when enabling it)
+            print(f"⚠️ Policy vector store using fallback mode (keyword matching)")
+            print(f"   To enable semantic search, set OPENAI_API_KEY or use local embeddings")
+            self.index = None
+            
+        except Exception as e:
+            print(f"Error loading policy store: {e}")
+            self.index = None
+    
+    def retrieve(self, query: str, top_k: int = 3) -> str:
+        """
+        Retrieve relevant policy information for a query
+        
+        Args:
+            query: Search query (e.g., "commercial use exclusions")
+            top_k: Number of relevant chunks to retrieve
+        
+        Returns:
+            Concatenated relevant policy text
+        """
+        return self._retrieve_cached(query, top_k, self._epoch, self._cache_bucket())
+    
+    def batch_retrieve(self, queries: List[str], top_k: int = 3) -> List[str]:
+        """
+        Retrieve policy text for several queries in one call
+        
+        Returns:
+            One policy text per query, in query order
+        """
+        epoch, bucket = self._epoch, self._cache_bucket()
+        return [self._retrieve_cached(query, top_k, epoch, bucket) for query in queries]
+    
+    def _retrieve_uncached(self, query: str, top_k: int, epoch: int = 0, bucket: int = 0) -> str:
+        # epoch/bucket only key the memo in _retrieve_cached
+        if self.index is None:
+            return self._get_fallback_text(query)
+        
+        try:
+            # Query vector store
+            retriever = self.index.as_retriever(similarity_top_k=top_k)
+            nodes = retriever.retrieve(query)
+            
+            # Concatenate results
+            results = []
+            for node in nodes:
+                results.append(node.text)
+            
+            return "\n\n".join(results) if results else self._get_fallback_text(query)
+            
+        except Exception as e:
+            print(f"Error retrieving from vector store: {e}")
+            return self._get_fallback_text(query)
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _get_fallback_text(query: str) -> str:
+        """
+        Fallback policy text when vector store unavailable
+        """
+        for pattern, text in _FALLBACK_TABLE:
+            if pattern.search(query):
+                return text
+        return _DEFAULT_POLICY_TEXT
+
 
 # Convenience function for workflow integration
+@lru_cache(maxsize=1)
 def create_policy_retriever() -> PolicyRetriever:
     """
-    Factory function to create policy retriever instance
+    Factory function returning the shared policy retriever instance
+    (the policy store is loaded once per process, not once per workflow)
     """
     return PolicyRetriever()
 
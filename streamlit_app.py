@@ -1,26 +1,14 @@
 # Ema Agentic Claims MVP - Updated 2025-11-25
 import streamlit as st
 import asyncio
+import gc
+import hashlib
 import os
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
-from workflow import AutoInsuranceWorkflow, GeminiStructuredClient
-
-load_dotenv()
-
-st.set_page_config(
-    page_title="Auto Insurance Claim Processor",
-    page_icon="🚗",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-st.title("🚗 Auto Insurance Claim Processor")
-st.markdown("### AI-Powered Claim Analysis & Settlement Recommendations")
 
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
-DATA_DIR.mkdir(exist_ok=True)
 
 SAMPLE_FILES = [
     "john.json",
@@ -32,257 +20,441 @@ SAMPLE_FILES = [
     "vandalism.json"
 ]
 
-# Sidebar Configuration
-st.sidebar.header("⚙️ Configuration")
+STAGE_LABELS = {
+    "fnol_summary": "🧠 FNOL Intelligence",
+    "triage": "🚦 Triage & Assignment",
+    "fraud_signal": "🕵️ Fraud Insights",
+    "decision": "📋 Claim Decision",
+}
+
+INSTRUCTIONS_MD = """
+### Quick Start
+1. Pick a sample claim or upload a JSON FNOL file
+2. Toggle **Gemini Agentic AI** to enable live reasoning
+3. Click **Process Claim** to see FNOL → Triage → Settlement
+
+### Agentic Workflow
+- **FNOL Intelligence**: Summarizes intake details & severity
+- **Smart Triage**: Assigns adjusters + SLA targets
+- **Fraud Radar**: Flags anomalies for SIU review
+- **Coverage Brain**: Aligns policy clauses & payout
+
+### Sample Claim Skeleton
+```json
+{
+    "claim_number": "CLAIM-001",
+    "policy_number": "POLICY-123",
+    "claimant_name": "John Doe",
+    "date_of_loss": "2025-06-20",
+    "loss_description": "Vehicle damage",
+    "estimated_repair_cost": 5000,
+    "vehicle_details": "2022 Honda Civic"
+}
+```
+"""
 
 # API Key Configuration
-def _ensure_gemini_key():
+def _lookup_key():
+    """(key, source) from the environment or Streamlit secrets.
+
+    Both lookups are O(1) and deliberately uncached: st.cache_data would pickle the key into a
+    cache every session can read, and a key set in os.environ mid-session should apply at once.
+    """
     env_key = os.environ.get("GEMINI_API_KEY")
     if env_key:
+        # A secrets key this session exported below still reports its real source
+        if env_key == st.session_state.get("_exported_secret_key"):
+            return env_key, "Streamlit secrets"
         return env_key, "environment/.env"
     secret_key = st.secrets["GEMINI_API_KEY"] if "GEMINI_API_KEY" in st.secrets else None
     if secret_key:
-        os.environ["GEMINI_API_KEY"] = secret_key
         return secret_key, "Streamlit secrets"
     return None, None
 
+def _ensure_gemini_key():
+    if not st.session_state.get("_env_loaded"):
+        from dotenv import load_dotenv
+        load_dotenv()
+        st.session_state["_env_loaded"] = True
+    key, source = _lookup_key()
+    # Export a secrets-provided key for the workflow once per session, not on every rerun
+    if key and source == "Streamlit secrets" and st.session_state.get("_exported_secret_key") != key:
+        os.environ["GEMINI_API_KEY"] = key
+        st.session_state["_exported_secret_key"] = key
+    return key, source
 
-preconfigured_key, key_source = _ensure_gemini_key()
+@st.cache_resource(show_spinner=False)
+def initialize_workflow(use_ai: bool, verbose: bool, api_key_fingerprint: str = None):
+    """Build the workflow (and Gemini client) once per configuration; reruns reuse it.
 
-use_gemini = st.sidebar.checkbox(
-    "Use Gemini Agentic AI",
-    value=bool(preconfigured_key),
-    help="Toggle to enable Gemini 2.5 Flash powered agents"
-)
+    api_key_fingerprint only keys the cache so a newly entered key rebuilds the client.
+    Returns (workflow, llm_error) - status messages are rendered by _show_llm_status.
+    """
+    # Deferred so the sidebar paints before the Gemini SDK / LlamaIndex imports
+    from workflow import AutoInsuranceWorkflow, GeminiStructuredClient
 
-if use_gemini:
-    preconfigured_key, key_source = _ensure_gemini_key()
-    if preconfigured_key:
-        st.sidebar.success(f"✅ Gemini key detected via {key_source}")
-    else:
-        gemini_api_key = st.sidebar.text_input(
-            "Gemini API Key (Google AI Studio)",
-            type="password",
-            help="Enter your Gemini 2.5 Flash API key"
-        )
-        if gemini_api_key:
-            os.environ["GEMINI_API_KEY"] = gemini_api_key
-            st.sidebar.success("✅ Gemini key stored for this session")
-        else:
-            st.sidebar.warning("Gemini key required for agentic mode")
-else:
-    st.sidebar.info("Using deterministic fallback mode (no live Gemini calls)")
-
-# Workflow Configuration
-verbose_mode = st.sidebar.checkbox(
-    "Verbose Mode",
-    value=False,
-    help="Show detailed processing steps"
-)
-
-def initialize_workflow(use_ai: bool, verbose: bool):
     llm_client = None
-    if use_ai and os.environ.get("GEMINI_API_KEY"):
+    llm_error = None
+    if use_ai and api_key_fingerprint and os.environ.get("GEMINI_API_KEY"):
         try:
-            llm_client = GeminiStructuredClient(api_key=os.environ["GEMINI_API_KEY"])
-            if llm_client.available:
-                st.sidebar.success("✅ Gemini ready")
-            else:
-                st.sidebar.warning("⚠️ Gemini SDK unavailable; using deterministic mode")
+            llm_client = GeminiStructuredClient(
+                api_key=os.environ["GEMINI_API_KEY"],
+                cache_dir=str(DATA_DIR / ".llm_cache"),
+            )
         except Exception as exc:
-            st.sidebar.error(f"❌ Gemini initialization failed: {exc}")
+            llm_error = str(exc)
             llm_client = None
-    elif use_ai:
-        st.sidebar.info("ℹ️ Provide a Gemini API key to enable live agents.")
 
-    return AutoInsuranceWorkflow(
+    workflow = AutoInsuranceWorkflow(
         policy_retriever=None,
         llm=llm_client if llm_client and llm_client.available else None,
         verbose=verbose,
         timeout=None,
     )
+    return workflow, llm_error
 
-workflow = initialize_workflow(use_gemini, verbose_mode)
+def _show_llm_status(workflow, use_ai: bool, llm_error: str = None):
+    if not use_ai:
+        return
+    if llm_error:
+        st.sidebar.error(f"❌ Gemini initialization failed: {llm_error}")
+    elif not os.environ.get("GEMINI_API_KEY"):
+        st.sidebar.info("ℹ️ Provide a Gemini API key to enable live agents.")
+    elif workflow.ai_connected:
+        st.sidebar.success("✅ Gemini ready")
+    else:
+        st.sidebar.warning("⚠️ Gemini SDK unavailable; using deterministic mode")
 
-# Main Interface
-col1, col2 = st.columns([2, 1])
+@st.cache_resource(show_spinner=False)
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """One long-lived event loop on a daemon thread; keeps client connections warm between clicks"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="claims-event-loop", daemon=True).start()
+    return loop
 
-with col1:
-    st.subheader("📄 Claim Processing")
-    
-    # File upload option
-    uploaded_file = st.file_uploader(
-        "Upload Claim JSON File",
-        type=['json'],
-        help="Upload a JSON file containing claim information"
+def run_async(coro):
+    """Run a coroutine on the background loop and block the script thread for its result"""
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+def iter_async(agen):
+    """Drive an async generator on the background loop, yielding its items to the script thread"""
+    async def _next():
+        try:
+            return True, await agen.__anext__()
+        except StopAsyncIteration:
+            return False, None
+
+    try:
+        while True:
+            has_item, item = run_async(_next())
+            if not has_item:
+                return
+            yield item
+    finally:
+        run_async(agen.aclose())
+
+@st.cache_resource(show_spinner=False)
+def _sample_corpus() -> dict:
+    """Bundled sample claims as validated ClaimInfo models, read and validated once per process"""
+    from workflow import parse_claim_bytes
+
+    corpus = {}
+    for name in SAMPLE_FILES:
+        path = DATA_DIR / name
+        if not path.exists():
+            continue
+        try:
+            corpus[name] = parse_claim_bytes(path.read_bytes())
+        except ValueError as exc:
+            print(f"Warning: Skipping invalid sample claim {name}: {exc}")
+    return corpus
+
+@st.cache_data(show_spinner=False)
+def _load_claim_model(data: bytes):
+    """Validated ClaimInfo for uploaded bytes, memoized by content so resubmits skip parse + validation"""
+    from workflow import parse_claim_bytes
+
+    return parse_claim_bytes(data)
+
+def _release_uploads(uploaded_files, retire: bool):
+    """Close upload buffers; retire=True also swaps the uploader's widget key so Streamlit
+    drops its stored copies of these files on the next rerun"""
+    for uploaded in uploaded_files:
+        uploaded.close()
+    if retire:
+        st.session_state["upload_generation"] = st.session_state.get("upload_generation", 0) + 1
+    gc.collect()
+
+def _process_batch(workflow, uploaded_files):
+    """Run several uploaded claims through workflow.run_batch and show one summary table"""
+    names, claims = [], []
+    for uploaded in uploaded_files:
+        try:
+            claims.append(_load_claim_model(uploaded.getvalue()))
+            names.append(uploaded.name)
+        except Exception as exc:
+            st.error(f"❌ Could not read {uploaded.name}: {exc}")
+        finally:
+            uploaded.close()
+    if not claims:
+        return
+
+    with st.spinner(f"Processing {len(claims)} claims..."):
+        results = run_async(workflow.run_batch(claims))
+
+    rows = []
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            rows.append({"file": name, "error": str(result)})
+            continue
+        decision = result["decision"]
+        triage = result.get("triage")
+        fraud_signal = result.get("fraud_signal")
+        rows.append({
+            "file": name,
+            "claim_number": decision.claim_number,
+            "covered": decision.covered,
+            "recommended_payout": decision.recommended_payout,
+            "priority": triage.priority if triage else None,
+            "fraud_risk": fraud_signal.risk_score if fraud_signal else None,
+            "error": None,
+        })
+
+    processed = sum(1 for row in rows if row["error"] is None)
+    st.success(f"✅ Processed {processed} of {len(rows)} claims")
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+    _release_uploads(uploaded_files, retire=processed > 0)
+
+def render():
+    """Render the claim processor page (called once per Streamlit rerun)"""
+    st.set_page_config(
+        page_title="Auto Insurance Claim Processor",
+        page_icon="🚗",
+        layout="wide",
+        initial_sidebar_state="expanded"
     )
-    
-    # Or select from existing files
-    claim_file_name = st.selectbox(
-        "Or Select Existing Claim File",
-        SAMPLE_FILES,
-        help="Choose from sample claim files"
+
+    st.title("🚗 Auto Insurance Claim Processor")
+    st.markdown("### AI-Powered Claim Analysis & Settlement Recommendations")
+
+    # Sidebar Configuration
+    st.sidebar.header("⚙️ Configuration")
+
+    preconfigured_key, key_source = _ensure_gemini_key()
+
+    use_gemini = st.sidebar.checkbox(
+        "Use Gemini Agentic AI",
+        value=bool(preconfigured_key),
+        help="Toggle to enable Gemini 2.5 Flash powered agents"
     )
-    
-    # Process button
-    if st.button("🔍 Process Claim", type="primary"):
-        try:
-            # Determine which file to process
-            if uploaded_file is not None:
-                # Save uploaded file temporarily
-                temp_path = DATA_DIR / f"temp_{uploaded_file.name}"
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-                file_to_process = str(temp_path)
+
+    if use_gemini:
+        if preconfigured_key:
+            st.sidebar.success(f"✅ Gemini key detected via {key_source}")
+        else:
+            gemini_api_key = st.sidebar.text_input(
+                "Gemini API Key (Google AI Studio)",
+                type="password",
+                help="Enter your Gemini 2.5 Flash API key"
+            )
+            if gemini_api_key:
+                os.environ["GEMINI_API_KEY"] = gemini_api_key
+                st.sidebar.success("✅ Gemini key stored for this session")
             else:
-                file_to_process = str(DATA_DIR / claim_file_name)
-            
-            # Show processing status
-            with st.spinner("Processing claim..."):
-                
-                # Create a container for verbose output
-                if verbose_mode:
-                    verbose_container = st.expander("🔍 Processing Details", expanded=True)
-                    with verbose_container:
-                        progress_placeholder = st.empty()
-                
-                # Run Workflow
-                async def run_workflow():
-                    return await workflow.run(claim_json_path=file_to_process)
-
-                result_payload = asyncio.run(run_workflow())
-                decision = result_payload["decision"]
-            
-            # Display Results
-            st.success("✅ Claim processed successfully!")
-            
-            # Clean up temp file
-            if uploaded_file is not None:
-                try:
-                    Path(file_to_process).unlink(missing_ok=True)
-                except Exception:
-                    pass
-
-        except FileNotFoundError:
-            st.error(f"❌ Error: Claim file '{file_to_process}' not found.")
-        except Exception as e:
-            st.error(f"❌ An error occurred: {e}")
-            decision = None
-
-with col2:
-    st.subheader("📊 System Status")
-    
-    # System status indicators
-    ai_connected = workflow.llm is not None and getattr(workflow.llm, "available", False)
-    ai_status = "🟢 Gemini Agents" if ai_connected else ("🟡 Rule-Based" if use_gemini else "🔵 Deterministic")
-    st.write(f"**Status:** {ai_status}")
-    
-    cloud_status = "🟢 Enabled" if ai_connected else "🔴 Off"
-    st.write(f"**Gemini Connectivity:** {cloud_status}")
-    
-    st.write(f"**Verbose:** {'🟢 On' if verbose_mode else '🔴 Off'}")
+                st.sidebar.warning("Gemini key required for agentic mode")
+    else:
+        st.sidebar.info("Using deterministic fallback mode (no live Gemini calls)")
 
-# Display Decision Results
-if 'decision' in locals() and decision:
-    st.markdown("---")
-    st.subheader("📋 Claim Decision")
-    
-    # Create result columns
-    result_col1, result_col2, result_col3 = st.columns(3)
-    
-    with result_col1:
-        st.metric(
-            label="Coverage Status",
-            value="COVERED" if decision.covered else "NOT COVERED",
-            delta="Approved" if decision.covered else "Denied"
-        )
+    # Workflow Configuration
+    verbose_mode = st.sidebar.checkbox(
+        "Verbose Mode",
+        value=False,
+        help="Show detailed processing steps"
+    )
+
+    _api_key = os.environ.get("GEMINI_API_KEY") if use_gemini else None
+    workflow, llm_error = initialize_workflow(
+        use_gemini,
+        verbose_mode,
+        hashlib.sha256(_api_key.encode()).hexdigest() if _api_key else None,
+    )
+    _show_llm_status(workflow, use_gemini, llm_error)
+
+    if st.sidebar.button("🧹 Clear LLM cache", help="Forget memoized Gemini responses and parsed claims"):
+        if workflow.llm is not None:
+            workflow.llm.clear_cache()
+        st.cache_data.clear()
+        st.sidebar.success("LLM cache cleared")
+
+    # Main Interface
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.subheader("📄 Claim Processing")
     
-    with result_col2:
-        st.metric(
-            label="Deductible",
-            value=f"${decision.deductible:.2f}"
+        # File upload option (several files are processed as one batch)
+        uploaded_files = st.file_uploader(
+            "Upload Claim JSON File(s)",
+            type=['json'],
+            accept_multiple_files=True,
+            help="Upload a JSON file containing claim information, or several to process them together",
+            key=f"claim_upload_{st.session_state.get('upload_generation', 0)}"
         )
+        uploaded_file = uploaded_files[0] if len(uploaded_files) == 1 else None
     
-    with result_col3:
-        st.metric(
-            label="Recommended Payout",
-            value=f"${decision.recommended_payout:.2f}",
-            delta=f"${decision.recommended_payout:.2f}" if decision.covered else "No payout"
+        # Or select from existing files
+        claim_file_name = st.selectbox(
+            "Or Select Existing Claim File",
+            SAMPLE_FILES,
+            help="Choose from sample claim files"
         )
     
-    # Detailed information
-    st.subheader("📝 Details")
+        # Process button
+        process_label = f"🔍 Process {len(uploaded_files)} Claims" if len(uploaded_files) > 1 else "🔍 Process Claim"
+        process_clicked = st.button(process_label, type="primary")
+        if process_clicked and len(uploaded_files) > 1:
+            _process_batch(workflow, uploaded_files)
+        elif process_clicked:
+            processed_ok = False
+            try:
+                # Determine which file to process
+                if uploaded_file is not None:
+                    # Straight from the upload buffer; nothing is written to DATA_DIR
+                    file_to_process = uploaded_file.name
+                    uploaded_file.seek(0)
+                    upload_bytes = uploaded_file.getvalue()
+                    claim_model = _load_claim_model(upload_bytes)
+                    input_key = (hashlib.sha256(upload_bytes).hexdigest(), workflow.ai_connected)
+                else:
+                    file_to_process = str(DATA_DIR / claim_file_name)
+                    claim_model = _sample_corpus().get(claim_file_name)
+                    if claim_model is None:
+                        raise FileNotFoundError(file_to_process)
+                    input_key = (f"sample:{claim_file_name}", workflow.ai_connected)
+            
+                if input_key == st.session_state.get("last_input_hash") and st.session_state.get("last_result"):
+                    # Same claim under the same agent mode: reuse the stored result, no new LLM calls
+                    st.info("ℹ️ This claim was just processed; showing the stored result.")
+                else:
+                    # Show processing status; verbose mode opens it to show each agent's raw output
+                    with st.status("Processing claim...", expanded=verbose_mode) as status:
+                        # Run Workflow, previewing each agent's output as soon as it finishes
+                        stage_slots = {stage: st.empty() for stage in STAGE_LABELS}
+                        result_payload = {}
+                        for stage, stage_result in iter_async(workflow.stream(claim_model=claim_model)):
+                            result_payload[stage] = stage_result
+                            status.update(label=f"{STAGE_LABELS[stage]} ready")
+                            with stage_slots[stage].container():
+                                st.caption(f"✅ {STAGE_LABELS[stage]}")
+                                st.json(stage_result.model_dump(mode="json"), expanded=False)
+                        status.update(label="Claim processed", state="complete")
+                    st.session_state["last_result"] = result_payload
+                    st.session_state["last_input_hash"] = input_key
+                    processed_ok = True
+            
+                    # Display Results
+                    st.success("✅ Claim processed successfully!")
+
+            except FileNotFoundError:
+                st.session_state.pop("last_result", None)
+                st.error(f"❌ Error: Claim file '{file_to_process}' not found.")
+            except Exception as e:
+                st.session_state.pop("last_result", None)
+                st.error(f"❌ An error occurred: {e}")
+            finally:
+                if uploaded_file is not None:
+                    upload_bytes = None
+                    _release_uploads(uploaded_files, retire=processed_ok)
+
+    with col2:
+        st.subheader("📊 System Status")
     
-    details_col1, details_col2 = st.columns(2)
+        # System status indicators (one markdown element instead of one per line)
+        ai_connected = workflow.ai_connected
+        ai_status = "🟢 Gemini Agents" if ai_connected else ("🟡 Rule-Based" if use_gemini else "🔵 Deterministic")
+        cloud_status = "🟢 Enabled" if ai_connected else "🔴 Off"
+        st.markdown(
+            f"**Status:** {ai_status}  \n"
+            f"**Gemini Connectivity:** {cloud_status}  \n"
+            f"**Verbose:** {'🟢 On' if verbose_mode else '🔴 Off'}"
+        )
+
+    # Display Decision Results
+    # Read from session_state so the last result survives unrelated reruns (e.g. toggling Verbose)
+    result_payload = st.session_state.get("last_result")
+    decision = result_payload["decision"] if result_payload else None
+    if decision:
+        st.markdown("---")
+        st.subheader("📋 Claim Decision")
     
-    with details_col1:
-        st.write(f"**Claim Number:** {decision.claim_number}")
-        st.write(f"**Coverage Decision:** {'✅ Covered' if decision.covered else '❌ Not Covered'}")
+        # Headline metrics
+        metrics = {
+            "Coverage Status": ("COVERED" if decision.covered else "NOT COVERED", "Approved" if decision.covered else "Denied"),
+            "Deductible": (f"${decision.deductible:.2f}", None),
+            "Recommended Payout": (
+                f"${decision.recommended_payout:.2f}",
+                f"${decision.recommended_payout:.2f}" if decision.covered else "No payout",
+            ),
+        }
+        for column, (label, (value, delta)) in zip(st.columns(len(metrics)), metrics.items()):
+            column.metric(label=label, value=value, delta=delta)
     
-    with details_col2:
-        st.write(f"**Deductible Amount:** ${decision.deductible:.2f}")
-        st.write(f"**Settlement Amount:** ${decision.recommended_payout:.2f}")
+        # Detailed information
+        st.markdown(
+            "### 📝 Details\n"
+            "| Field | Value |\n"
+            "|---|---|\n"
+            f"| Claim Number | {decision.claim_number} |\n"
+            f"| Coverage Decision | {'✅ Covered' if decision.covered else '❌ Not Covered'} |\n"
+            f"| Deductible Amount | ${decision.deductible:.2f} |\n"
+            f"| Settlement Amount | ${decision.recommended_payout:.2f} |"
+        )
     
-    if decision.notes:
-        st.subheader("💬 Analysis Notes")
-        st.info(decision.notes)
-
-    fnol_summary = result_payload.get("fnol_summary") if 'result_payload' in locals() else None
-    triage = result_payload.get("triage") if 'result_payload' in locals() else None
-    fraud_signal = result_payload.get("fraud_signal") if 'result_payload' in locals() else None
-
-    if fnol_summary:
-        st.subheader("🧠 FNOL Intelligence")
-        st.write(f"**Incident Summary:** {fnol_summary.incident_summary}")
-        st.write(f"**Impact:** {fnol_summary.impact_assessment}")
-        st.write(f"**Severity Level:** {fnol_summary.severity_level}")
-        if fnol_summary.recommended_actions:
-            st.write("**Recommended Actions:**")
-            st.markdown("\n".join([f"- {action}" for action in fnol_summary.recommended_actions]))
-
-    if triage:
-        st.subheader("🚦 Triage & Assignment")
-        st.write(f"**Priority:** {triage.priority}")
-        st.write(f"**Assignment:** {triage.assignment}")
-        st.write(f"**SLA Target:** {triage.target_sla_hours} hours")
-        st.info(triage.rationale)
-
-    if fraud_signal:
-        st.subheader("🕵️ Fraud Insights")
-        st.metric("Fraud Risk", f"{fraud_signal.risk_score*100:.0f}%")
-        if fraud_signal.flags:
-            st.write("**Flags:**")
-            st.markdown("\n".join([f"- {flag}" for flag in fraud_signal.flags]))
-        st.warning(fraud_signal.recommendation)
-
-# Instructions and Information
-st.sidebar.markdown("---")
-st.sidebar.header("📖 Instructions")
-st.sidebar.markdown("""
-### Quick Start
-1. Pick a sample claim or upload a JSON FNOL file
-2. Toggle **Gemini Agentic AI** to enable live reasoning
-3. Click **Process Claim** to see FNOL → Triage → Settlement
+        if decision.notes:
+            st.subheader("💬 Analysis Notes")
+            st.info(decision.notes)
 
-### Agentic Workflow
-- **FNOL Intelligence**: Summarizes intake details & severity
-- **Smart Triage**: Assigns adjusters + SLA targets
-- **Fraud Radar**: Flags anomalies for SIU review
-- **Coverage Brain**: Aligns policy clauses & payout
+        fnol_summary = result_payload.get("fnol_summary")
+        triage = result_payload.get("triage")
+        fraud_signal = result_payload.get("fraud_signal")
+
+        if fnol_summary:
+            fnol_md = (
+                "### 🧠 FNOL Intelligence\n"
+                f"**Incident Summary:** {fnol_summary.incident_summary}  \n"
+                f"**Impact:** {fnol_summary.impact_assessment}  \n"
+                f"**Severity Level:** {fnol_summary.severity_level}"
+            )
+            if fnol_summary.recommended_actions:
+                fnol_md += "\n\n**Recommended Actions:**\n" + "\n".join(
+                    f"- {action}" for action in fnol_summary.recommended_actions
+                )
+            st.markdown(fnol_md)
+
+        if triage:
+            st.markdown(
+                "### 🚦 Triage & Assignment\n"
+                f"**Priority:** {triage.priority}  \n"
+                f"**Assignment:** {triage.assignment}  \n"
+                f"**SLA Target:** {triage.target_sla_hours} hours"
+            )
+            st.info(triage.rationale)
+
+        if fraud_signal:
+            st.subheader("🕵️ Fraud Insights")
+            st.metric("Fraud Risk", f"{fraud_signal.risk_score*100:.0f}%")
+            if fraud_signal.flags:
+                st.markdown("**Flags:**\n" + "\n".join(f"- {flag}" for flag in fraud_signal.flags))
+            st.warning(fraud_signal.recommendation)
+
+    # Instructions and Information
+    st.sidebar.markdown("---")
+    st.sidebar.header("📖 Instructions")
+    st.sidebar.markdown(INSTRUCTIONS_MD)
+
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("**Powered by Gemini & LlamaIndex**")
 
-### Sample Claim Skeleton
-```json
-{
-    "claim_number": "CLAIM-001",
-    "policy_number": "POLICY-123",
-    "claimant_name": "John Doe",
-    "date_of_loss": "2025-06-20",
-    "loss_description": "Vehicle damage",
-    "estimated_repair_cost": 5000,
-    "vehicle_details": "2022 Honda Civic"
-}
-```
-""")
 
-st.sidebar.markdown("---")
-st.sidebar.markdown("**Powered by Gemini & LlamaIndex**")
+if __name__ == "__main__":
+    render()
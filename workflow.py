@@ -1,9 +1,18 @@
 import json
 import asyncio
+import hashlib
+import mmap
 import os
 import re
-from typing import Dict, Any, Optional, List, Type
-from pydantic import BaseModel, Field
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Any, Optional, List, Tuple, Type
+from pydantic import BaseModel, Field, ValidationError
 from llama_index.core.workflow import (
     Event,
     StartEvent,
@@ -16,9 +25,19 @@ from llama_index.core.retrievers import BaseRetriever
 from llama_index.core.vector_stores.types import MetadataFilters
 
 try:
-    import google.generativeai as genai
-except ImportError:  # Library is optional until Gemini mode enabled
-    genai = None
+    import orjson
+except ImportError:  # Optional accelerator; stdlib json is used otherwise
+    orjson = None
+
+# Claim files at least this large are parsed from a read-only mmap instead of a copy
+_MMAP_THRESHOLD_BYTES = 64 * 1024
+
+# Stop adding retrieved chunks to the prompt once this many characters are collected (0 = no cap)
+_POLICY_TEXT_MAX_CHARS = int(os.getenv("POLICY_TEXT_MAX_CHARS", "0"))
+
+_WS_RE = re.compile(r"\s+")
+_JSON_BLOCK_RE = re.compile(r"(\{[\s\S]*\}|\[[\s\S]*\])")
+_COVERED_RE = re.compile(r"not covered|covered", re.IGNORECASE)
 
 # Comprehensive Schemas
 class ClaimInfo(BaseModel):
@@ -31,6 +50,16 @@ class ClaimInfo(BaseModel):
     estimated_repair_cost: float
     vehicle_details: Optional[str] = None
 
+    # Derived values read by the rule-based fallbacks; computed on access so they can't go
+    # stale if a shared instance is mutated or model_copy()'d
+    @property
+    def loss_description_lower(self) -> str:
+        return self.loss_description.lower()
+
+    @property
+    def is_high_value(self) -> bool:
+        return self.estimated_repair_cost >= 10000
+
 class PolicyQueries(BaseModel):
     queries: List[str] = Field(
         default_factory=list,
@@ -69,23 +98,61 @@ class FraudSignal(BaseModel):
     recommendation: str
 
 # Enhanced Parsing Functions
+def parse_claim_data(data: Dict[str, Any]) -> ClaimInfo:
+    """Validate an in-memory claim payload with ClaimInfo schema"""
+    data = dict(data)
+    
+    # Convert legacy format to new format if needed
+    if 'damage_amount' in data:
+        data['estimated_repair_cost'] = data.pop('damage_amount')
+    if 'policyholder_name' in data:
+        data['claimant_name'] = data.pop('policyholder_name')
+    if 'date_of_incident' in data:
+        data['date_of_loss'] = data.pop('date_of_incident')
+    if 'description' in data:
+        data['loss_description'] = data.pop('description')
+        
+    return ClaimInfo.model_validate(data)
+
+def _load_json_file(file_path: str) -> Any:
+    """Decode a JSON file, using orjson (and mmap for large files) when available"""
+    with open(file_path, 'rb') as file:
+        if orjson is None:
+            return json.load(file)
+        if os.fstat(file.fileno()).st_size >= _MMAP_THRESHOLD_BYTES:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    return orjson.loads(view)
+        return orjson.loads(file.read())
+
+# Quoted legacy field names; payloads that mention none of them can skip the field mapping
+_LEGACY_CLAIM_KEYS = (b'"damage_amount"', b'"policyholder_name"', b'"date_of_incident"', b'"description"')
+
+def _validate_claim_json(data: bytes) -> ClaimInfo:
+    """Decode and validate claim JSON, in one pydantic-core pass when it uses the current layout"""
+    if not any(key in data for key in _LEGACY_CLAIM_KEYS):
+        try:
+            return ClaimInfo.model_validate_json(data)
+        except ValidationError:
+            pass  # e.g. escaped legacy keys; the mapping path below reports real errors
+    payload = orjson.loads(data) if orjson is not None else json.loads(data)
+    return parse_claim_data(payload)
+
+def parse_claim_bytes(data: bytes) -> ClaimInfo:
+    """Parse raw claim JSON bytes (e.g. an upload) and validate with ClaimInfo schema"""
+    try:
+        return _validate_claim_json(data)
+    except Exception as e:
+        raise ValueError(f"Error parsing claim payload: {e}")
+
 def parse_claim(file_path: str) -> ClaimInfo:
     """Parse claim data from JSON file and validate with ClaimInfo schema"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-        
-        # Convert legacy format to new format if needed
-        if 'damage_amount' in data:
-            data['estimated_repair_cost'] = data.pop('damage_amount')
-        if 'policyholder_name' in data:
-            data['claimant_name'] = data.pop('policyholder_name')
-        if 'date_of_incident' in data:
-            data['date_of_loss'] = data.pop('date_of_incident')
-        if 'description' in data:
-            data['loss_description'] = data.pop('description')
-            
-        return ClaimInfo.model_validate(data)
+        with open(file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size < _MMAP_THRESHOLD_BYTES:
+                return _validate_claim_json(file.read())
+        data = _load_json_file(file_path)
+        return parse_claim_data(data)
     except FileNotFoundError:
         raise FileNotFoundError(f"Claim file not found: {file_path}")
     except Exception as e:
@@ -99,10 +166,13 @@ def get_declarations_docs(policy_retriever, policy_number: str, top_k: int = 1):
             filters = MetadataFilters.from_dicts([
                 {"key": "policy_number", "value": policy_number}
             ])
-            docs = policy_retriever.retrieve(
-                f"declarations page for {policy_number}",
-                filters=filters
-            )
+            query = f"declarations page for {policy_number}"
+            index = getattr(policy_retriever, '_index', None)
+            if index is not None and hasattr(index, 'as_retriever'):
+                # Push the filter and limit into the vector store so only matching nodes are scored
+                scoped = index.as_retriever(filters=filters, similarity_top_k=top_k)
+                return scoped.retrieve(query)
+            docs = policy_retriever.retrieve(query, filters=filters)
             return docs[:top_k] if docs else []
         else:
             # Fallback for mock implementation
@@ -111,10 +181,68 @@ def get_declarations_docs(policy_retriever, policy_number: str, top_k: int = 1):
         print(f"Warning: Could not retrieve declarations for {policy_number}: {e}")
         return []
 
+def _to_json(value: Any) -> Any:
+    """Serialize model prompt values; call sites pass models so the fallback path never dumps them"""
+    return value.model_dump_json() if isinstance(value, BaseModel) else value
+
+@lru_cache(maxsize=256)
+def _fallback_policy_text(policy_number: str) -> str:
+    """Demo policy wording used when no retriever returns text; only the policy number varies"""
+    return f"""
+CALIFORNIA PERSONAL AUTO POLICY
+Policy Number: {policy_number}
+
+PART D - COVERAGE FOR DAMAGE TO YOUR AUTO
+COLLISION COVERAGE
+We will pay for direct and accidental loss to your covered auto caused by collision with another object or by upset of your covered auto.
+
+DEDUCTIBLE
+For each loss, our limit of liability will be reduced by the applicable deductible amount shown in the Declarations.
+Standard collision deductible: $500
+Comprehensive deductible: $250
+
+LIMITS OF LIABILITY
+Our limit of liability for loss will be the lesser of:
+1. The actual cash value of the stolen or damaged property; or
+2. The amount necessary to repair or replace the property.
+
+EXCLUSIONS
+We do not provide coverage for:
+1. Loss to your covered auto which occurs while it is used to carry persons or property for compensation
+2. Loss due to wear and tear, freezing, mechanical breakdown
+3. Loss to equipment designed for the reproduction of sound
+        """
+
+@dataclass(slots=True)
+class _DocShim:
+    """Minimal node stand-in for text returned by the custom PolicyRetriever"""
+    id_: str
+    content: str
+
+    def get_content(self) -> str:
+        return self.content
+
+@dataclass(slots=True)
+class ClaimRunState:
+    """Per-run values shared between steps; stored on the Context once by load_claim_info"""
+    claim_info: ClaimInfo
+    claim_info_json: str
+    stage_queue: Optional[asyncio.Queue] = None
+    fnol_summary: Optional[FNOLSummary] = None
+    triage_decision: Optional[TriageDecision] = None
+    fraud_signal: Optional[FraudSignal] = None
+    policy_text: Optional[str] = None
+
 # Event Classes
 class ClaimInfoEvent(Event):
     claim_info: ClaimInfo
 
+class AgentReviewEvent(Event):
+    claim_info: ClaimInfo
+
+class AgentReviewDoneEvent(Event):
+    pass
+
 class PolicyQueryEvent(Event):
     queries: PolicyQueries
 
@@ -131,8 +259,9 @@ class LogEvent(Event):
     msg: str
     delta: bool = False
 
-# Prompts
-FNOL_SUMMARY_PROMPT = """You are assisting a claims intake specialist.
+# Prompt builders: plain f-strings, so rendering skips str.format field lookup
+def fnol_summary_prompt(claim_info: str) -> str:
+    return f"""You are assisting a claims intake specialist.
 Summarize the First Notice of Loss (FNOL) using the following structure:
 1. incident_summary
 2. impact_assessment (vehicle + human impact)
@@ -144,7 +273,8 @@ Claim Data:
 
 Return valid JSON matching the FNOLSummary schema."""
 
-TRIAGE_PROMPT = """You are a virtual claims routing manager.
+def triage_prompt(claim_info: str, fnol_summary: str) -> str:
+    return f"""You are a virtual claims routing manager.
 Decide how to triage the claim using:
 - priority (Immediate, High, Standard, Low)
 - assignment (Specialty adjuster, Desk adjuster, Express lane, etc.)
@@ -157,7 +287,8 @@ FNOL Summary: {fnol_summary}
 
 Return JSON for TriageDecision."""
 
-FRAUD_ANALYSIS_PROMPT = """You are part of the Special Investigations Unit.
+def fraud_analysis_prompt(claim_info: str, triage: str) -> str:
+    return f"""You are part of the Special Investigations Unit.
 Rate the fraud risk between 0 and 1, list up to 3 flags, and give a recommendation.
 
 Consider:
@@ -170,7 +301,8 @@ Triage Decision: {triage}
 
 Respond with JSON for FraudSignal."""
 
-GENERATE_POLICY_QUERIES_PROMPT = """\
+def policy_queries_prompt(claim_info: str) -> str:
+    return f"""\
 You are an assistant tasked with determining what insurance policy sections to consult for a given auto claim.
 
 **Instructions:**
@@ -188,7 +320,8 @@ Claim Data:
 Return a JSON object matching the PolicyQueries schema.
 """
 
-POLICY_RECOMMENDATION_PROMPT = """\
+def policy_recommendation_prompt(claim_info: str, policy_text: str) -> str:
+    return f"""\
 Given the retrieved policy sections for this claim, determine:
 - If the incident is covered under the policy
 - The applicable deductible amount
@@ -205,13 +338,48 @@ Policy Text:
 Return a JSON object matching PolicyRecommendation schema.
 """
 
+def _import_genai():
+    try:
+        import google.generativeai as genai
+    except ImportError:  # Library is optional until Gemini mode enabled
+        return None
+    return genai
+
 # Gemini client wrapper
 class GeminiStructuredClient:
-    def __init__(self, model: str = "gemini-2.5-flash", api_key: Optional[str] = None, temperature: float = 0.2):
-        self.available = bool(api_key and genai)
+    # Blocking SDK calls (see _generate_blocking) get their own pool instead of the loop's small default one
+    _EXECUTOR = ThreadPoolExecutor(
+        max_workers=int(os.getenv("GEMINI_POOL", "16")),
+        thread_name_prefix="gemini",
+    )
+
+    def __init__(
+        self,
+        model: str = "gemini-2.5-flash",
+        api_key: Optional[str] = None,
+        temperature: float = 0.2,
+        max_concurrency: int = 5,
+        cache_size: int = 256,
+        cache_dir: Optional[str] = None,
+    ):
+        # The SDK pulls in protobuf/gRPC, so it is only imported once a key is supplied
+        genai = _import_genai() if api_key else None
+        self.available = genai is not None
         self._model_name = model
         self._temperature = temperature
         self._client = None
+        # In-flight Gemini calls are capped per event loop (asyncio semaphores are loop-bound,
+        # and the API/Streamlit callers may drive one client from several loops)
+        self._max_concurrency = max_concurrency
+        self._slots = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore
+        # Validated JSON responses keyed by sha256(schema + prompt); an identical prompt
+        # (same agent, same claim, same upstream outputs) is answered without a Gemini call.
+        # cache_dir, if set, also persists entries across processes.
+        self._cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self._async_loop = None  # loop the SDK's async transport was first used on
         if self.available:
             genai.configure(api_key=api_key)
             self._client = genai.GenerativeModel(
@@ -219,28 +387,98 @@ class GeminiStructuredClient:
                 generation_config={"temperature": temperature, "response_mime_type": "application/json"}
             )
 
-    async def structured_predict(self, schema: Type[BaseModel], prompt_template: str, **kwargs) -> BaseModel:
+    async def structured_predict(self, schema: Type[BaseModel], build_prompt: Callable[..., str], **kwargs) -> BaseModel:
         if not self.available or not self._client:
             raise RuntimeError("Gemini client not configured")
-        prompt = prompt_template.format(**kwargs)
-
-        def _call():
-            return self._client.generate_content(prompt)
-
-        response = await asyncio.to_thread(_call)
-        text = self._extract_text(response)
+        prompt = build_prompt(**kwargs)
+        cache_key = hashlib.sha256(f"{schema.__name__}\n{prompt}".encode("utf-8")).hexdigest()
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            # Re-validate per hit: callers may mutate the returned model
+            return schema.model_validate_json(cached)
+
+        async with self._concurrency_slot():
+            text = await self._generate(prompt)
         json_payload = self._extract_json_block(text)
         if json_payload is None:
             raise ValueError("Gemini response lacked JSON payload")
-        return schema.model_validate_json(json_payload)
+        result = schema.model_validate_json(json_payload)
+        self._cache_put(cache_key, json_payload)
+        return result
+
+    async def _generate(self, prompt: str) -> str:
+        loop = asyncio.get_running_loop()
+        if self._async_loop is None:
+            self._async_loop = loop
+        if loop is self._async_loop and hasattr(self._client, "generate_content_async"):
+            # Stream so chunks are drained as they arrive rather than buffered by the SDK
+            response = await self._client.generate_content_async(prompt, stream=True)
+            return "".join([self._extract_text(chunk) async for chunk in response])
+        # The SDK's async transport stays bound to the loop that first used it; calls from
+        # other loops (e.g. one asyncio.run() per dashboard batch) go through a worker thread
+        return await loop.run_in_executor(self._EXECUTOR, self._generate_blocking, prompt)
+
+    def _generate_blocking(self, prompt: str) -> str:
+        response = self._client.generate_content(prompt, stream=True)
+        return "".join(self._extract_text(chunk) for chunk in response)
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._cache_lock:
+            payload = self._cache.get(key)
+            if payload is not None:
+                self._cache.move_to_end(key)
+                return payload
+        if self._cache_dir is None:
+            return None
+        try:
+            payload = (self._cache_dir / f"{key}.json").read_text(encoding="utf-8")
+        except OSError:
+            return None
+        self._cache_put(key, payload, persist=False)
+        return payload
+
+    def _cache_put(self, key: str, payload: str, persist: bool = True) -> None:
+        with self._cache_lock:
+            self._cache[key] = payload
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        if persist and self._cache_dir is not None:
+            try:
+                self._cache_dir.mkdir(parents=True, exist_ok=True)
+                (self._cache_dir / f"{key}.json").write_text(payload, encoding="utf-8")
+            except OSError as exc:
+                print(f"Warning: Could not persist LLM cache entry: {exc}")
+
+    def clear_cache(self) -> None:
+        """Drop memoized responses, including any persisted under cache_dir"""
+        with self._cache_lock:
+            self._cache.clear()
+        if self._cache_dir is not None and self._cache_dir.is_dir():
+            for entry in self._cache_dir.glob("*.json"):
+                entry.unlink(missing_ok=True)
+
+    def _concurrency_slot(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slot = self._slots.get(loop)
+        if slot is None:
+            slot = self._slots[loop] = asyncio.Semaphore(self._max_concurrency)
+        return slot
 
     @staticmethod
     def _extract_text(response: Any) -> str:
-        if hasattr(response, "text") and response.text:
-            return response.text
+        try:
+            text = getattr(response, "text", None)
+        except ValueError:
+            # The SDK raises when a (streamed) chunk has no parts, e.g. a terminal
+            # finish_reason/usage-only chunk; walk the candidates instead
+            text = None
+        if text:
+            return text
         parts = []
         for candidate in getattr(response, "candidates", []) or []:
-            for part in getattr(candidate, "content", getattr(candidate, "parts", [])):
+            content = getattr(candidate, "content", None)
+            for part in getattr(content, "parts", None) or getattr(candidate, "parts", None) or []:
                 text = getattr(part, "text", None)
                 if text:
                     parts.append(text)
@@ -253,7 +491,11 @@ class GeminiStructuredClient:
         cleaned = text.strip()
         if cleaned.startswith("```"):
             cleaned = "\n".join(cleaned.split("\n")[1:-1])
-        match = re.search(r"(\{[\s\S]*\}|\[[\s\S]*\])", cleaned)
+        # response_mime_type is JSON, so the reply is normally one bare document; the regex
+        # would select that whole string anyway, so skip the scan
+        if cleaned[:1] + cleaned[-1:] in ("{}", "[]"):
+            return cleaned
+        match = _JSON_BLOCK_RE.search(cleaned)
         if not match:
             return None
         return match.group(1)
@@ -285,8 +527,26 @@ class AutoInsuranceWorkflow(Workflow):
             self.policy_retriever = policy_retriever
         
         self.llm = llm or self._init_gemini_client()
+        # Fixed for the workflow's lifetime; status displays read this instead of probing the client
+        self.ai_connected = bool(self.llm and getattr(self.llm, "available", False))
         self._verbose = verbose
 
+        self._predict_queries = self._build_predictor(
+            PolicyQueries, policy_queries_prompt, self._generate_fallback_queries
+        )
+        self._predict_recommendation = self._build_predictor(
+            PolicyRecommendation, policy_recommendation_prompt, self._generate_fallback_recommendation
+        )
+        self._predict_fnol = self._build_predictor(
+            FNOLSummary, fnol_summary_prompt, self._generate_fallback_fnol_summary
+        )
+        self._predict_triage = self._build_predictor(
+            TriageDecision, triage_prompt, self._generate_fallback_triage
+        )
+        self._predict_fraud = self._build_predictor(
+            FraudSignal, fraud_analysis_prompt, self._generate_fallback_fraud_signal
+        )
+
     def _init_gemini_client(self) -> Optional[GeminiStructuredClient]:
         api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
         try:
@@ -297,26 +557,54 @@ class AutoInsuranceWorkflow(Workflow):
             return None
 
     @step
-    async def load_claim_info(self, ctx: Context, ev: StartEvent) -> ClaimInfoEvent:
-        """Load and validate claim information from JSON file"""
+    async def load_claim_info(self, ctx: Context, ev: StartEvent) -> ClaimInfoEvent | AgentReviewEvent:
+        """Load and validate claim information, then fan out to the agent review and coverage branches"""
         if self._verbose:
             ctx.write_event_to_stream(LogEvent(msg=">> Loading Claim Info"))
         
-        claim_info = parse_claim(ev.claim_json_path)
-        await ctx.set("claim_info", claim_info)
+        claim_model = ev.get("claim_model")
+        claim_data = ev.get("claim_data")
+        claim_bytes = ev.get("claim_bytes")
+        if claim_model is not None:
+            claim_info = claim_model
+        elif claim_data is not None:
+            claim_info = parse_claim_data(claim_data)
+        elif claim_bytes is not None:
+            claim_info = parse_claim_bytes(claim_bytes)
+        else:
+            claim_info = parse_claim(ev.claim_json_path)
+        # Every prompt embeds the claim; serialize it once per run instead of once per agent.
+        # Later steps read and fill this one object instead of round-tripping per key
+        await ctx.set("run_state", ClaimRunState(
+            claim_info=claim_info,
+            claim_info_json=claim_info.model_dump_json(),
+            stage_queue=ev.get("stage_queue"),
+        ))
         
         if self._verbose:
             ctx.write_event_to_stream(LogEvent(msg=f">> Loaded claim: {claim_info.claim_number}"))
 
-        fnol_summary = await self._record_fnol_summary(ctx, claim_info)
-        await ctx.set("fnol_summary", fnol_summary)
+        # FNOL -> triage -> fraud only feeds finalize_decision, so it runs alongside policy retrieval
+        ctx.send_event(AgentReviewEvent(claim_info=claim_info))
+        return ClaimInfoEvent(claim_info=claim_info)
 
-        triage = await self._record_triage(ctx, claim_info, fnol_summary)
-        await ctx.set("triage_decision", triage)
+    @step
+    async def review_claim_agents(self, ctx: Context, ev: AgentReviewEvent) -> AgentReviewDoneEvent:
+        """Run the FNOL, triage and fraud agents (each consumes the previous agent's output)"""
+        claim_info = ev.claim_info
+        state: ClaimRunState = await ctx.get("run_state")
+        claim_info_json = state.claim_info_json
 
-        await self._record_fraud_signal(ctx, claim_info, triage)
+        state.fnol_summary = await self._record_fnol_summary(ctx, claim_info, claim_info_json)
+        self._emit_stage(state, "fnol_summary", state.fnol_summary)
+
+        state.triage_decision = await self._record_triage(ctx, claim_info, claim_info_json, state.fnol_summary)
+        self._emit_stage(state, "triage", state.triage_decision)
+
+        state.fraud_signal = await self._record_fraud_signal(ctx, claim_info, claim_info_json, state.triage_decision)
+        self._emit_stage(state, "fraud_signal", state.fraud_signal)
         
-        return ClaimInfoEvent(claim_info=claim_info)
+        return AgentReviewDoneEvent()
 
     @step
     async def generate_policy_queries(self, ctx: Context, ev: ClaimInfoEvent) -> PolicyQueryEvent:
@@ -324,13 +612,11 @@ class AutoInsuranceWorkflow(Workflow):
         if self._verbose:
             ctx.write_event_to_stream(LogEvent(msg=">> Generating Policy Queries"))
         
-        queries = await self._maybe_llm_predict(
-            PolicyQueries,
-            GENERATE_POLICY_QUERIES_PROMPT,
-            fallback=self._generate_fallback_queries,
-            ctx=ctx,
-            fallback_kwargs={"claim_info": ev.claim_info},
-            claim_info=ev.claim_info.model_dump_json(),
+        state: ClaimRunState = await ctx.get("run_state")
+        queries = await self._predict_queries(
+            ctx,
+            {"claim_info": ev.claim_info},
+            claim_info=state.claim_info_json,
         )
         
         if self._verbose:
@@ -344,10 +630,10 @@ class AutoInsuranceWorkflow(Workflow):
             f"Coverage conditions for {claim_info.policy_number}",
             f"Deductible application for collision damage",
             f"Settlement amount calculation for vehicle damage",
-            f"Exclusions for {claim_info.loss_description.lower()}",
+            f"Exclusions for {claim_info.loss_description_lower}",
             f"Policy limits and coverage details"
         ]
-        return PolicyQueries(queries=queries)
+        return PolicyQueries.model_construct(queries=queries)
 
     @step
     async def retrieve_policy_text(self, ctx: Context, ev: PolicyQueryEvent) -> PolicyMatchedEvent:
@@ -355,7 +641,8 @@ class AutoInsuranceWorkflow(Workflow):
         if self._verbose:
             ctx.write_event_to_stream(LogEvent(msg=">> Retrieving policy sections"))
 
-        claim_info = await ctx.get("claim_info")
+        state: ClaimRunState = await ctx.get("run_state")
+        claim_info = state.claim_info
         combined_docs = {}
         
         if self.policy_retriever:
@@ -363,30 +650,36 @@ class AutoInsuranceWorkflow(Workflow):
                 # Check if using PolicyRetriever (has retrieve method) or LlamaIndex BaseRetriever
                 if hasattr(self.policy_retriever, 'retrieve') and not hasattr(self.policy_retriever, 'aretrieve'):
                     # Custom PolicyRetriever with vector store
-                    for query in ev.queries.queries:
-                        if self._verbose:
+                    queries = ev.queries.queries
+                    if self._verbose:
+                        for query in queries:
                             ctx.write_event_to_stream(LogEvent(msg=f">> Query: {query}"))
-                        
-                        # Retrieve policy text directly
-                        policy_text_chunk = self.policy_retriever.retrieve(query, top_k=3)
-                        
+                    
+                    # Retrieve policy text directly, in one call when the retriever supports batches
+                    if hasattr(self.policy_retriever, 'batch_retrieve'):
+                        policy_text_chunks = self.policy_retriever.batch_retrieve(queries, top_k=3)
+                    else:
+                        policy_text_chunks = [self.policy_retriever.retrieve(query, top_k=3) for query in queries]
+                    
+                    for query, policy_text_chunk in zip(queries, policy_text_chunks):
                         # Create pseudo-document for compatibility
-                        combined_docs[query] = type('Doc', (), {
-                            'id_': query,
-                            'get_content': lambda self=policy_text_chunk: self
-                        })()
+                        combined_docs[query] = _DocShim(id_=query, content=policy_text_chunk)
                 else:
                     # Standard LlamaIndex retriever
-                    for query in ev.queries.queries:
-                        if self._verbose:
+                    queries = ev.queries.queries
+                    if self._verbose:
+                        for query in queries:
                             ctx.write_event_to_stream(LogEvent(msg=f">> Query: {query}"))
-                        
-                        # Fetch policy text
-                        if hasattr(self.policy_retriever, 'aretrieve'):
-                            docs = await self.policy_retriever.aretrieve(query)
-                        else:
-                            docs = self.policy_retriever.retrieve(query)
-                        
+                    
+                    # Fetch policy text; async retrievers run all queries concurrently
+                    if hasattr(self.policy_retriever, 'aretrieve'):
+                        results = await asyncio.gather(
+                            *(self.policy_retriever.aretrieve(query) for query in queries)
+                        )
+                    else:
+                        results = [self.policy_retriever.retrieve(query) for query in queries]
+                    
+                    for docs in results:
                         for d in docs:
                             combined_docs[d.id_] = d
 
@@ -403,23 +696,31 @@ class AutoInsuranceWorkflow(Workflow):
                     ctx.write_event_to_stream(LogEvent(msg=f">> Policy retrieval failed: {e}"))
         
         if combined_docs:
-            # Handle both custom PolicyRetriever docs and LlamaIndex docs
-            policy_chunks = []
+            # Handle both custom PolicyRetriever docs and LlamaIndex docs. The same chunk often comes
+            # back under different ids/queries, so key on the text itself to keep it once
+            policy_chunks: Dict[str, None] = {}
+            total_chars = 0
             for doc in combined_docs.values():
                 if hasattr(doc, 'get_content'):
                     content = doc.get_content()
                     # If get_content returns a string, use it; otherwise get text attribute
-                    policy_chunks.append(content if isinstance(content, str) else str(content))
+                    chunk = content if isinstance(content, str) else str(content)
                 elif hasattr(doc, 'text'):
-                    policy_chunks.append(doc.text)
+                    chunk = doc.text
                 else:
-                    policy_chunks.append(str(doc))
+                    chunk = str(doc)
+                if chunk in policy_chunks:
+                    continue
+                policy_chunks[chunk] = None
+                total_chars += len(chunk)
+                if _POLICY_TEXT_MAX_CHARS and total_chars >= _POLICY_TEXT_MAX_CHARS:
+                    break
             policy_text = "\n\n".join(policy_chunks)
         else:
             # Fallback policy text for demo purposes
             policy_text = self._get_fallback_policy_text(claim_info)
         
-        await ctx.set("policy_text", policy_text)
+        state.policy_text = policy_text
         
         if self._verbose:
             ctx.write_event_to_stream(LogEvent(msg=f">> Retrieved {len(policy_text)} characters of policy text"))
@@ -428,30 +729,7 @@ class AutoInsuranceWorkflow(Workflow):
 
     def _get_fallback_policy_text(self, claim_info: ClaimInfo) -> str:
         """Generate fallback policy text for demo purposes"""
-        return f"""
-CALIFORNIA PERSONAL AUTO POLICY
-Policy Number: {claim_info.policy_number}
-
-PART D - COVERAGE FOR DAMAGE TO YOUR AUTO
-COLLISION COVERAGE
-We will pay for direct and accidental loss to your covered auto caused by collision with another object or by upset of your covered auto.
-
-DEDUCTIBLE
-For each loss, our limit of liability will be reduced by the applicable deductible amount shown in the Declarations.
-Standard collision deductible: $500
-Comprehensive deductible: $250
-
-LIMITS OF LIABILITY
-Our limit of liability for loss will be the lesser of:
-1. The actual cash value of the stolen or damaged property; or
-2. The amount necessary to repair or replace the property.
-
-EXCLUSIONS
-We do not provide coverage for:
-1. Loss to your covered auto which occurs while it is used to carry persons or property for compensation
-2. Loss due to wear and tear, freezing, mechanical breakdown
-3. Loss to equipment designed for the reproduction of sound
-        """
+        return _fallback_policy_text(claim_info.policy_number)
 
     @step
     async def generate_recommendation(self, ctx: Context, ev: PolicyMatchedEvent) -> RecommendationEvent:
@@ -459,15 +737,12 @@ We do not provide coverage for:
         if self._verbose:
             ctx.write_event_to_stream(LogEvent(msg=">> Generating Policy Recommendation"))
         
-        claim_info = await ctx.get("claim_info")
+        state: ClaimRunState = await ctx.get("run_state")
         
-        recommendation = await self._maybe_llm_predict(
-            PolicyRecommendation,
-            POLICY_RECOMMENDATION_PROMPT,
-            fallback=self._generate_fallback_recommendation,
-            ctx=ctx,
-            fallback_kwargs={"claim_info": claim_info, "policy_text": ev.policy_text},
-            claim_info=claim_info.model_dump_json(),
+        recommendation = await self._predict_recommendation(
+            ctx,
+            {"claim_info": state.claim_info, "policy_text": ev.policy_text},
+            claim_info=state.claim_info_json,
             policy_text=ev.policy_text,
         )
         recommendation.recommendation_summary = self._sanitize_text(recommendation.recommendation_summary)
@@ -496,7 +771,7 @@ We do not provide coverage for:
             summary += " exceeds collision limits; recommend denying coverage."
         summary = self._sanitize_text(summary)
         
-        return PolicyRecommendation(
+        return PolicyRecommendation.model_construct(
             policy_section="PART D - COLLISION COVERAGE",
             recommendation_summary=summary,
             deductible=deductible,
@@ -504,44 +779,41 @@ We do not provide coverage for:
         )
 
     @step
-    async def finalize_decision(self, ctx: Context, ev: RecommendationEvent) -> DecisionEvent:
-        """Finalize the claim decision based on policy recommendation"""
+    async def finalize_decision(
+        self, ctx: Context, ev: RecommendationEvent | AgentReviewDoneEvent
+    ) -> Optional[DecisionEvent]:
+        """Finalize the claim decision once the recommendation and agent review are both in"""
+        ready = ctx.collect_events(ev, [RecommendationEvent, AgentReviewDoneEvent])
+        if ready is None:
+            return None
+        
         if self._verbose:
             ctx.write_event_to_stream(LogEvent(msg=">> Finalizing Decision"))
         
-        claim_info = await ctx.get("claim_info")
-        rec = ev.recommendation
-        fnol_summary = await self._safe_ctx_get(ctx, "fnol_summary")
-        triage = await self._safe_ctx_get(ctx, "triage_decision")
-        fraud_signal = await self._safe_ctx_get(ctx, "fraud_signal")
+        state: ClaimRunState = await ctx.get("run_state")
+        claim_info = state.claim_info
+        rec = ready[0].recommendation
+        fnol_summary = state.fnol_summary
+        triage = state.triage_decision
+        fraud_signal = state.fraud_signal
         
+        # Covered when the summary mentions "covered" but never "not covered", or a payout is recommended
         covered = (
-            (
-                "covered" in rec.recommendation_summary.lower()
-                and "not covered" not in rec.recommendation_summary.lower()
-            )
-            or (rec.settlement_amount is not None and rec.settlement_amount > 0)
+            (rec.settlement_amount is not None and rec.settlement_amount > 0)
+            or {m.group().lower() for m in _COVERED_RE.finditer(rec.recommendation_summary)} == {"covered"}
         )
         
         deductible = rec.deductible if rec.deductible is not None else 0.0
         recommended_payout = rec.settlement_amount if rec.settlement_amount else 0.0
 
-        notes_lines = []
-        if rec.policy_section:
-            notes_lines.append(f"Policy {claim_info.policy_number} · {rec.policy_section}")
-        if fnol_summary:
-            notes_lines.append(
-                f"FNOL severity {fnol_summary.severity_level}: {fnol_summary.incident_summary}"
-            )
-        if triage:
-            notes_lines.append(
-                f"Triage ⇒ {triage.priority} priority · {triage.assignment} (SLA {triage.target_sla_hours}h)"
-            )
-        if fraud_signal:
-            risk_pct = fraud_signal.risk_score * 100
-            notes_lines.append(f"Fraud risk {risk_pct:.0f}% ({fraud_signal.recommendation})")
-        notes_lines.append(f"Settlement rationale: {rec.recommendation_summary}")
-        notes = "\n".join(notes_lines)
+        # recommendation_summary was already sanitized in generate_recommendation
+        notes = "\n".join(filter(None, [
+            rec.policy_section and f"Policy {claim_info.policy_number} · {rec.policy_section}",
+            fnol_summary and f"FNOL severity {fnol_summary.severity_level}: {fnol_summary.incident_summary}",
+            triage and f"Triage ⇒ {triage.priority} priority · {triage.assignment} (SLA {triage.target_sla_hours}h)",
+            fraud_signal and f"Fraud risk {fraud_signal.risk_score * 100:.0f}% ({fraud_signal.recommendation})",
+            f"Settlement rationale: {rec.recommendation_summary}",
+        ]))
         
         decision = ClaimDecision(
             claim_number=claim_info.claim_number,
@@ -561,23 +833,41 @@ We do not provide coverage for:
         """Output the final decision result"""
         if self._verbose:
             ctx.write_event_to_stream(LogEvent(msg=f">> Decision: {ev.decision.model_dump_json()}"))
-        fnol_summary = await self._safe_ctx_get(ctx, "fnol_summary")
-        triage = await self._safe_ctx_get(ctx, "triage_decision")
-        fraud_signal = await self._safe_ctx_get(ctx, "fraud_signal")
+        state: ClaimRunState = await ctx.get("run_state")
+        self._emit_stage(state, "decision", ev.decision)
         return StopEvent(
             result={
                 "decision": ev.decision,
-                "fnol_summary": fnol_summary,
-                "triage": triage,
-                "fraud_signal": fraud_signal,
+                "fnol_summary": state.fnol_summary,
+                "triage": state.triage_decision,
+                "fraud_signal": state.fraud_signal,
             }
         )
 
     # Compatibility method for the Streamlit app
-    async def run(self, claim_json_path: str) -> Dict[str, Any]:
-        """Run the workflow with a claim JSON file path"""
+    async def run(
+        self,
+        claim_json_path: Optional[str] = None,
+        claim_data: Optional[Dict[str, Any]] = None,
+        claim_bytes: Optional[bytes] = None,
+        claim_model: Optional[ClaimInfo] = None,
+        stage_queue: Optional[asyncio.Queue] = None,
+    ) -> Dict[str, Any]:
+        """Run the workflow with a claim JSON file path, raw JSON bytes, a pre-parsed claim dict,
+        or an already validated ClaimInfo (claim_model skips parsing entirely)
+
+        If stage_queue is given, each agent result is also put on it as (stage, model).
+        """
+        if claim_model is None and claim_data is None and claim_bytes is None and claim_json_path is None:
+            raise ValueError("One of claim_json_path, claim_bytes, claim_data or claim_model must be provided")
         try:
-            handler = super().run(claim_json_path=claim_json_path)
+            handler = super().run(
+                claim_json_path=claim_json_path,
+                claim_data=claim_data,
+                claim_bytes=claim_bytes,
+                claim_model=claim_model,
+                stage_queue=stage_queue,
+            )
             result = await handler
             return result
         except Exception as e:
@@ -585,40 +875,105 @@ We do not provide coverage for:
                 print(f"Workflow error: {e}")
             raise e
 
-    async def _maybe_llm_predict(
+    async def stream(
+        self,
+        claim_json_path: Optional[str] = None,
+        claim_data: Optional[Dict[str, Any]] = None,
+        claim_bytes: Optional[bytes] = None,
+        claim_model: Optional[ClaimInfo] = None,
+    ) -> AsyncIterator[Tuple[str, BaseModel]]:
+        """Run the workflow, yielding (stage, model) as each agent finishes.
+
+        Stages use the run() result keys: fnol_summary, triage, fraud_signal, then decision.
+        Errors from the run are re-raised once the stages produced so far are consumed.
+        """
+        stage_queue: asyncio.Queue = asyncio.Queue()
+
+        async def _drive():
+            try:
+                return await self.run(
+                    claim_json_path=claim_json_path,
+                    claim_data=claim_data,
+                    claim_bytes=claim_bytes,
+                    claim_model=claim_model,
+                    stage_queue=stage_queue,
+                )
+            finally:
+                stage_queue.put_nowait(None)
+
+        task = asyncio.ensure_future(_drive())
+        try:
+            while (item := await stage_queue.get()) is not None:
+                yield item
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def run_batch(self, claims: List[Any], max_concurrency: int = 5) -> List[Any]:
+        """Run claims (ClaimInfo models or pre-parsed payload dicts) concurrently,
+        at most max_concurrency at a time.
+
+        Results keep the input order; a claim that fails yields its exception instead of a result.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _one(claim: Any) -> Dict[str, Any]:
+            async with semaphore:
+                if isinstance(claim, ClaimInfo):
+                    return await self.run(claim_model=claim)
+                return await self.run(claim_data=claim)
+
+        return await asyncio.gather(*(_one(claim) for claim in claims), return_exceptions=True)
+
+    def run_sync(
         self,
-        schema: Type[BaseModel],
-        prompt_template: str,
-        *,
-        fallback,
-        ctx: Context,
-        fallback_kwargs: Optional[Dict[str, Any]] = None,
-        **prompt_kwargs,
-    ) -> BaseModel:
-        if self.llm and self.llm.available:
+        claim_json_path: Optional[str] = None,
+        claim_data: Optional[Dict[str, Any]] = None,
+        claim_bytes: Optional[bytes] = None,
+        claim_model: Optional[ClaimInfo] = None,
+    ) -> Dict[str, Any]:
+        """Blocking variant of run() for worker threads (drives its own event loop)"""
+        return asyncio.run(self.run(
+            claim_json_path=claim_json_path,
+            claim_data=claim_data,
+            claim_bytes=claim_bytes,
+            claim_model=claim_model,
+        ))
+
+    def _build_predictor(self, schema: Type[BaseModel], build_prompt: Callable[..., str], fallback):
+        """Bind a call site's schema, prompt and fallback once; the returned coroutine
+        function only takes the per-claim fallback kwargs and prompt values"""
+        if not self.ai_connected:
+            async def predict(ctx: Context, fallback_kwargs: Dict[str, Any], **prompt_kwargs) -> BaseModel:
+                return fallback(**fallback_kwargs)
+            return predict
+
+        structured_predict = self.llm.structured_predict
+        verbose = self._verbose
+
+        async def predict(ctx: Context, fallback_kwargs: Dict[str, Any], **prompt_kwargs) -> BaseModel:
             try:
-                return await self.llm.structured_predict(schema, prompt_template, **prompt_kwargs)
+                rendered = {key: _to_json(value) for key, value in prompt_kwargs.items()}
+                return await structured_predict(schema, build_prompt, **rendered)
             except Exception as exc:
-                if self._verbose:
+                if verbose:
                     ctx.write_event_to_stream(LogEvent(msg=f">> Gemini call failed, using fallback: {exc}"))
-        fallback_kwargs = fallback_kwargs or {}
-        return fallback(**fallback_kwargs)
+            return fallback(**fallback_kwargs)
+        return predict
 
     def _sanitize_text(self, text: Optional[str]) -> str:
         if not text:
             return ""
-        squashed = re.sub(r"\s+", " ", text)
-        squashed = squashed.replace(" ,", ",").replace(" .", ".")
-        return squashed.strip()
+        return _WS_RE.sub(" ", text).replace(" ,", ",").replace(" .", ".").strip()
 
-    async def _safe_ctx_get(self, ctx: Context, key: str) -> Optional[Any]:
-        try:
-            return await ctx.get(key)
-        except KeyError:
-            return None
+    def _emit_stage(self, state: ClaimRunState, stage: str, payload: BaseModel) -> None:
+        if state.stage_queue is not None:
+            state.stage_queue.put_nowait((stage, payload))
 
+    # Fallback outputs are built from already-validated ClaimInfo fields, so they skip validation
     def _generate_fallback_fnol_summary(self, claim_info: ClaimInfo) -> FNOLSummary:
-        return FNOLSummary(
+        return FNOLSummary.model_construct(
             incident_summary=f"Collision reported for {claim_info.claimant_name} on {claim_info.date_of_loss}.",
             impact_assessment=f"Vehicle damage estimated at ${claim_info.estimated_repair_cost:,.2f} with description: {claim_info.loss_description}.",
             severity_level="High" if claim_info.estimated_repair_cost > 10000 else "Medium",
@@ -630,7 +985,7 @@ We do not provide coverage for:
         )
 
     def _generate_fallback_triage(self, claim_info: ClaimInfo, **_) -> TriageDecision:
-        high_value = claim_info.estimated_repair_cost >= 10000
+        high_value = claim_info.is_high_value
         priority = "Immediate" if high_value else "Standard"
         assignment = "Field adjuster" if high_value else "Desk adjuster"
         sla = 8 if high_value else 24
@@ -639,57 +994,52 @@ We do not provide coverage for:
             if high_value
             else "Standard collision claim with moderate damage; handle via desk team."
         )
-        return TriageDecision(priority=priority, assignment=assignment, rationale=rationale, target_sla_hours=sla)
+        return TriageDecision.model_construct(priority=priority, assignment=assignment, rationale=rationale, target_sla_hours=sla)
 
     def _generate_fallback_fraud_signal(self, claim_info: ClaimInfo, **_) -> FraudSignal:
         risk = 0.2
         flags = []
-        if "delivery" in claim_info.loss_description.lower():
+        if "delivery" in claim_info.loss_description_lower:
             risk += 0.2
             flags.append("Commercial use disclosed")
         if claim_info.estimated_repair_cost > 15000:
             risk += 0.2
             flags.append("High repair estimate vs. vehicle value")
         recommendation = "No SIU referral" if risk < 0.5 else "Escalate for SIU desk review"
-        return FraudSignal(risk_score=min(risk, 1.0), flags=flags, recommendation=recommendation)
+        return FraudSignal.model_construct(risk_score=min(risk, 1.0), flags=flags, recommendation=recommendation)
 
-    async def _record_fnol_summary(self, ctx: Context, claim_info: ClaimInfo) -> FNOLSummary:
+    async def _record_fnol_summary(self, ctx: Context, claim_info: ClaimInfo, claim_info_json: str) -> FNOLSummary:
         if self._verbose:
             ctx.write_event_to_stream(LogEvent(msg=">> Summarizing FNOL"))
-        summary = await self._maybe_llm_predict(
-            FNOLSummary,
-            FNOL_SUMMARY_PROMPT,
-            fallback=self._generate_fallback_fnol_summary,
-            ctx=ctx,
-            fallback_kwargs={"claim_info": claim_info},
-            claim_info=claim_info.model_dump_json(),
+        summary = await self._predict_fnol(
+            ctx,
+            {"claim_info": claim_info},
+            claim_info=claim_info_json,
         )
         return summary
 
-    async def _record_triage(self, ctx: Context, claim_info: ClaimInfo, fnol_summary: FNOLSummary) -> TriageDecision:
+    async def _record_triage(
+        self, ctx: Context, claim_info: ClaimInfo, claim_info_json: str, fnol_summary: FNOLSummary
+    ) -> TriageDecision:
         if self._verbose:
             ctx.write_event_to_stream(LogEvent(msg=">> Computing Triage"))
-        triage = await self._maybe_llm_predict(
-            TriageDecision,
-            TRIAGE_PROMPT,
-            fallback=self._generate_fallback_triage,
-            ctx=ctx,
-            fallback_kwargs={"claim_info": claim_info},
-            claim_info=claim_info.model_dump_json(),
-            fnol_summary=fnol_summary.model_dump_json(),
+        triage = await self._predict_triage(
+            ctx,
+            {"claim_info": claim_info},
+            claim_info=claim_info_json,
+            fnol_summary=fnol_summary,
         )
         return triage
 
-    async def _record_fraud_signal(self, ctx: Context, claim_info: ClaimInfo, triage: TriageDecision) -> None:
+    async def _record_fraud_signal(
+        self, ctx: Context, claim_info: ClaimInfo, claim_info_json: str, triage: TriageDecision
+    ) -> FraudSignal:
         if self._verbose:
             ctx.write_event_to_stream(LogEvent(msg=">> Running Fraud Scan"))
-        fraud_signal = await self._maybe_llm_predict(
-            FraudSignal,
-            FRAUD_ANALYSIS_PROMPT,
-            fallback=self._generate_fallback_fraud_signal,
-            ctx=ctx,
-            fallback_kwargs={"claim_info": claim_info},
-            claim_info=claim_info.model_dump_json(),
-            triage=triage.model_dump_json(),
+        fraud_signal = await self._predict_fraud(
+            ctx,
+            {"claim_info": claim_info},
+            claim_info=claim_info_json,
+            triage=triage,
         )
-        await ctx.set("fraud_signal", fraud_signal)
\ No newline at end of file
+        return fraud_signal
\ No newline at end of file